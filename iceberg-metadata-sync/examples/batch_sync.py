@@ -1,33 +1,53 @@
 """
 Example: Sync multiple tables in batch.
 """
+from concurrent.futures import ThreadPoolExecutor
+
+from src.file_scanner import (
+    DEFAULT_LIST_THREADS,
+    IGNORE_LOCALITY_CONF,
+    LISTING_PARALLELISM_CONF,
+    LISTING_THRESHOLD_CONF,
+)
+from src.metadata_tracker import ARROW_CONFS, HAS_ARROW
 from src.sync_manager import IcebergSyncManager
 from pyspark.sql import SparkSession
 
 def sync_multiple_tables(tables_config):
     """
-    Sync multiple tables using shared SparkSession.
+    Sync multiple tables concurrently using shared SparkSession.
     
     Args:
         tables_config: List of dicts with table configuration
     """
-    # Create shared Spark session (reuse across tables)
-    spark = SparkSession.builder \
+    # Create shared Spark session (reuse across tables). Confs the syncs
+    # rely on are set here once, since the session is shared by threads
+    builder = SparkSession.builder \
         .appName("Iceberg-Multi-Table-Sync") \
         .config("spark.jars.packages",
                 "org.apache.iceberg:iceberg-spark-runtime-3.3_2.12:1.2.0") \
         .config("spark.sql.extensions",
                 "org.apache.iceberg.spark.extensions.IcebergSparkSessionExtensions") \
+        .config("spark.scheduler.mode", "FAIR") \
         .config("spark.driver.memory", "8g") \
         .config("spark.executor.memory", "16g") \
-        .getOrCreate()
+        .config(IGNORE_LOCALITY_CONF, "true") \
+        .config(LISTING_THRESHOLD_CONF, "1") \
+        .config(LISTING_PARALLELISM_CONF, str(DEFAULT_LIST_THREADS))
+    
+    if HAS_ARROW:
+        for key, value in ARROW_CONFS.items():
+            builder = builder.config(key, value)
     
-    results = []
+    spark = builder.getOrCreate()
     
-    for config in tables_config:
+    def sync_table(index, config):
         db = config['database']
         table = config['table']
         
+        # Give each table its own FAIR scheduler pool so jobs interleave
+        spark.sparkContext.setLocalProperty("spark.scheduler.pool", f"sync-{index}")
+        
         print(f"\n{'='*80}")
         print(f"Syncing: {db}.{table}")
         print(f"{'='*80}")
@@ -44,18 +64,30 @@ def sync_multiple_tables(tables_config):
             )
             
             success = manager.sync()
-            results.append({
+            result = {
                 'table': f"{db}.{table}",
                 'success': success
-            })
+            }
             
         except Exception as e:
             print(f"❌ Error syncing {db}.{table}: {e}")
-            results.append({
+            result = {
                 'table': f"{db}.{table}",
                 'success': False,
                 'error': str(e)
-            })
+            }
+        
+        return result
+    
+    # Syncs are mostly waiting on driver RPCs, so run tables concurrently;
+    # results are collected in submission order, so the summary follows
+    # tables_config
+    with ThreadPoolExecutor(max_workers=min(8, max(1, len(tables_config)))) as executor:
+        futures = [
+            executor.submit(sync_table, index, config)
+            for index, config in enumerate(tables_config)
+        ]
+        results = [future.result() for future in futures]
     
     spark.stop()
     
@@ -9,8 +9,12 @@ setup(
     install_requires=[
         "pyspark>=3.2.0,<3.6.0",
         "pyyaml>=6.0",
+        "orjson>=3.8.0",
     ],
     extras_require={
+        "arrow": [
+            "pyarrow>=4.0.0",
+        ],
         "dev": [
             "pytest>=7.4.0",
             "pytest-cov>=4.1.0",
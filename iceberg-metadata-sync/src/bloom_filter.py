@@ -0,0 +1,201 @@
+"""
+Bloom filters for processed file membership checks.
+"""
+import hashlib
+import json
+import math
+from pathlib import Path
+from typing import Iterable, List
+
+# Each layer of a growing filter holds this many times the items of the
+# previous one
+GROWTH_FACTOR = 2
+
+# Each layer of a growing filter gets this fraction of the previous layer's
+# false positive rate, so the rates of all layers sum to under the target
+TIGHTENING_RATIO = 0.5
+
+
+class BloomFilter:
+    """
+    Bloom filter over strings sized for a capacity and false positive rate.
+    
+    Membership checks never give false negatives. Up to `capacity` items,
+    false positives occur at about `error_rate`; past it the rate climbs
+    quickly, so callers that keep adding items should use
+    ScalableBloomFilter instead.
+    """
+    
+    def __init__(self, capacity: int, error_rate: float, data: bytes = None, count: int = 0):
+        """
+        Initialize Bloom filter.
+        
+        Args:
+            capacity: Number of items the filter is sized for
+            error_rate: False positive rate at capacity
+            data: Optional serialized bit array from `to_bytes`
+            count: Number of distinct items already in `data`
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.count = count
+        
+        # Optimal bit count and hash count for the capacity and rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        
+        num_bytes = (self.num_bits + 7) // 8
+        if data is not None and len(data) != num_bytes:
+            raise ValueError(f"Expected {num_bytes} bytes of filter data, got {len(data)}")
+        self.bits = bytearray(data) if data is not None else bytearray(num_bytes)
+    
+    @property
+    def is_full(self) -> bool:
+        """Whether the filter holds as many items as it was sized for."""
+        return self.count >= self.capacity
+    
+    def _positions(self, item: str):
+        """Yield bit positions for an item using double hashing."""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, item: str):
+        """Add an item to the filter."""
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        
+        # Items that set no new bit were (probably) already present
+        if added:
+            self.count += 1
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+    
+    def to_bytes(self) -> bytes:
+        """Serialize the bit array."""
+        return bytes(self.bits)
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that grows with the number of items added.
+    
+    Items go into the newest layer; once it is full, a layer
+    GROWTH_FACTOR times larger with a TIGHTENING_RATIO times lower false
+    positive rate is added. The overall false positive rate stays under
+    `error_rate` however many items are added, at the cost of checking
+    every layer.
+    """
+    
+    def __init__(self, initial_capacity: int = 10000, error_rate: float = 0.01):
+        """
+        Initialize an empty filter.
+        
+        Args:
+            initial_capacity: Number of items the first layer is sized for
+            error_rate: Overall false positive rate to stay under
+        """
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.layers: List[BloomFilter] = []
+    
+    def __len__(self) -> int:
+        return sum(layer.count for layer in self.layers)
+    
+    def _new_layer(self, count: int = 0) -> BloomFilter:
+        """Create the next layer, sized from its position."""
+        index = len(self.layers)
+        return BloomFilter(
+            capacity=self.initial_capacity * GROWTH_FACTOR ** index,
+            error_rate=self.error_rate * (1 - TIGHTENING_RATIO) * TIGHTENING_RATIO ** index,
+            count=count
+        )
+    
+    def add(self, item: str):
+        """Add an item to the filter."""
+        if item in self:
+            return
+        
+        if not self.layers or self.layers[-1].is_full:
+            self.layers.append(self._new_layer())
+        self.layers[-1].add(item)
+    
+    def update(self, items: Iterable[str]):
+        """Add multiple items to the filter."""
+        for item in items:
+            self.add(item)
+    
+    def __contains__(self, item: str) -> bool:
+        return any(item in layer for layer in self.layers)
+    
+    def to_bytes(self) -> bytes:
+        """Serialize as a JSON header line followed by each layer's bit array."""
+        header = {
+            'initial_capacity': self.initial_capacity,
+            'error_rate': self.error_rate,
+            'counts': [layer.count for layer in self.layers]
+        }
+        return json.dumps(header).encode('utf-8') + b'\n' + b''.join(
+            layer.to_bytes() for layer in self.layers
+        )
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'ScalableBloomFilter':
+        """
+        Deserialize a filter written by `to_bytes`.
+        
+        Raises:
+            ValueError: If the data is malformed or truncated
+        """
+        header, sep, bits = data.partition(b'\n')
+        if not sep:
+            raise ValueError("Missing filter header")
+        
+        try:
+            header = json.loads(header)
+            bloom = cls(header['initial_capacity'], header['error_rate'])
+            counts = header['counts']
+        except (KeyError, TypeError, UnicodeDecodeError) as e:
+            raise ValueError(f"Malformed filter header: {e}") from e
+        
+        offset = 0
+        for count in counts:
+            layer = bloom._new_layer(count=count)
+            chunk = bits[offset:offset + len(layer.bits)]
+            if len(chunk) != len(layer.bits):
+                raise ValueError(f"Expected {len(layer.bits)} bytes of filter data, got {len(chunk)}")
+            layer.bits[:] = chunk
+            bloom.layers.append(layer)
+            offset += len(chunk)
+        
+        if offset != len(bits):
+            raise ValueError(f"Expected {offset} bytes of filter data, got {len(bits)}")
+        
+        return bloom
+    
+    @classmethod
+    def load(cls, path: Path, **kwargs) -> 'ScalableBloomFilter':
+        """
+        Load a filter from a file, or create an empty one if it doesn't exist.
+        
+        Args:
+            path: File written from `to_bytes`
+            **kwargs: Parameters for a new filter if the file doesn't exist
+        
+        Returns:
+            ScalableBloomFilter instance
+        
+        Raises:
+            ValueError: If the file is malformed or truncated
+        """
+        try:
+            return cls.from_bytes(path.read_bytes())
+        except FileNotFoundError:
+            return cls(**kwargs)
@@ -2,11 +2,48 @@
 File scanner for discovering data files in replicated storage.
 """
 import logging
-from typing import Set, List
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterable, Set, List, Optional, Tuple, Union
 from pathlib import Path
 
+from .path_set import PathSet
+
 logger = logging.getLogger(__name__)
 
+# Threads used to list and stat directories in local scans
+DEFAULT_STAT_THREADS = 16
+
+# Default parallelism for listing directories through Spark
+DEFAULT_LIST_THREADS = 25
+
+# Spark SQL conf that stops file listing from fetching block locations
+IGNORE_LOCALITY_CONF = "spark.sql.sources.ignoreDataLocality"
+
+# Spark SQL conf capping the tasks used to list directories in parallel
+LISTING_PARALLELISM_CONF = "spark.sql.sources.parallelPartitionDiscovery.parallelism"
+
+# Spark SQL conf for the number of root paths above which listing is done by
+# Spark tasks rather than serially on the driver (Spark's default is 32)
+LISTING_THRESHOLD_CONF = "spark.sql.sources.parallelPartitionDiscovery.threshold"
+
+
+def _changed_at(entry: os.DirEntry) -> float:
+    """Latest of a directory entry's modification and status change times."""
+    stat = entry.stat()
+    return max(stat.st_mtime, stat.st_ctime)
+
+
+def _modified_after(changed_since: float) -> str:
+    """
+    Format a Unix time as a UTC `modifiedAfter` bound for Spark file sources.
+    
+    Truncated to whole seconds, and a second early, so the bound stays
+    inclusive. The reader must be given a `timeZone` of UTC to match.
+    """
+    return datetime.fromtimestamp(int(changed_since) - 1, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
 
 class FileScanner:
     """
@@ -14,16 +51,22 @@ class FileScanner:
     Works with local filesystem or distributed storage via Spark.
     """
     
-    def __init__(self, spark_session=None):
+    def __init__(
+        self,
+        spark_session=None,
+        stat_threads: int = DEFAULT_STAT_THREADS
+    ):
         """
         Initialize file scanner.
         
         Args:
             spark_session: Optional SparkSession for distributed scanning
+            stat_threads: Number of threads for local directory listing
         """
         self.spark = spark_session
+        self.stat_threads = stat_threads
     
-    def scan_data_files(self, data_path: str, file_extension: str = ".parquet") -> Set[str]:
+    def scan_data_files(self, data_path: str, file_extension: str = ".parquet") -> PathSet:
         """
         Scan directory recursively for data files.
         
@@ -39,37 +82,116 @@ class FileScanner:
         else:
             return self._scan_local(data_path, file_extension)
     
-    def _scan_with_spark(self, data_path: str, file_extension: str) -> Set[str]:
-        """Scan using Spark's Hadoop FileSystem API (efficient for distributed storage)."""
+    def scan_data_files_since(
+        self, data_path: str, changed_since: float, file_extension: str = ".parquet"
+    ) -> PathSet:
+        """
+        Scan directory recursively for data files changed since a point in time.
+        
+        Locally a file counts as changed when its mtime or ctime is at or
+        after `changed_since`; ctime is included because replication tools
+        usually preserve mtime but cannot preserve ctime. On distributed
+        storage only the modification time is available.
+        
+        Args:
+            data_path: Root path to scan
+            changed_since: Unix timestamp lower bound
+            file_extension: File extension to filter (default: .parquet)
+        
+        Returns:
+            Set of absolute file paths
+        """
+        if self.spark:
+            return self._scan_with_spark(data_path, file_extension, changed_since)
+        else:
+            return self._scan_local(data_path, file_extension, changed_since)
+    
+    def to_dataframe(self, file_paths: Set[str]):
+        """
+        Convert scanned file paths into a single-column Spark DataFrame.
+        
+        Args:
+            file_paths: Set of file paths
+        
+        Returns:
+            DataFrame with a `path` string column
+        """
+        if not self.spark:
+            raise ValueError("A SparkSession is required to build a DataFrame")
+        
+        return self.spark.createDataFrame(
+            [(file_path,) for file_path in file_paths],
+            "path STRING"
+        )
+    
+    def scan_entries(
+        self,
+        entries: Iterable[Union[str, os.DirEntry]],
+        file_extension: str = ".parquet"
+    ) -> PathSet:
+        """
+        Collect data files from an already known list of files.
+        
+        For callers that already have the file list, e.g. from the tool that
+        replicated the files, so the tree doesn't have to be walked again.
+        
+        Args:
+            entries: File paths or DirEntry objects
+            file_extension: File extension to filter (default: .parquet)
+        
+        Returns:
+            Set of absolute file paths
+        """
+        data_files = PathSet(
+            os.path.abspath(path)
+            for path in map(os.fspath, entries)
+            if path.endswith(file_extension)
+        )
+        
+        logger.info(f"Collected {len(data_files)} {file_extension} files")
+        return data_files
+    
+    def scan_data_files_df(
+        self,
+        data_path: str,
+        file_extension: str = ".parquet",
+        changed_since: Optional[float] = None
+    ):
+        """
+        Scan directory recursively for data files, without collecting them.
+        
+        Args:
+            data_path: Root path to scan
+            file_extension: File extension to filter (default: .parquet)
+            changed_since: Optional Unix timestamp; only files modified at
+                or after it are returned
+        
+        Returns:
+            DataFrame with a `path` string column, or None if no files exist
+        """
+        if not self.spark:
+            raise ValueError("A SparkSession is required to build a DataFrame")
+        
         logger.info(f"Scanning with Spark: {data_path}")
+        return self._list_with_spark(data_path, file_extension, changed_since)
+    
+    def _scan_with_spark(
+        self, data_path: str, file_extension: str, changed_since: Optional[float] = None
+    ) -> PathSet:
+        """
+        Scan using Spark's Hadoop FileSystem API (efficient for distributed storage).
         
-        sc = self.spark.sparkContext
-        jvm = sc._jvm
-        hadoop_conf = sc._jsc.hadoopConfiguration()
+        The paths come back to Python as one collected result rather than
+        one Py4J call per file.
+        """
+        logger.info(f"Scanning with Spark: {data_path}")
         
         try:
-            fs = jvm.org.apache.hadoop.fs.FileSystem.get(
-                jvm.java.net.URI(data_path),
-                hadoop_conf
-            )
+            files_df = self._list_with_spark(data_path, file_extension, changed_since)
+            if files_df is None:
+                return PathSet()
             
-            path = jvm.org.apache.hadoop.fs.Path(data_path)
-            
-            if not fs.exists(path):
-                logger.warning(f"Path does not exist: {data_path}")
-                return set()
-            
-            data_files = set()
-            file_iterator = fs.listFiles(path, True)  # recursive=True
-            
-            file_count = 0
-            while file_iterator.hasNext():
-                file_status = file_iterator.next()
-                file_path = file_status.getPath().toString()
-                
-                if file_path.endswith(file_extension):
-                    data_files.add(file_path)
-                    file_count += 1
+            data_files = PathSet(row.path for row in files_df.collect())
             
             logger.info(f"Found {len(data_files)} {file_extension} files")
             return data_files
@@ -78,25 +200,122 @@ class FileScanner:
             logger.error(f"Error scanning with Spark: {e}")
             raise
     
-    def _scan_local(self, data_path: str, file_extension: str) -> Set[str]:
+    def _list_with_spark(
+        self, data_path: str, file_extension: str, changed_since: Optional[float] = None
+    ):
+        """
+        List data files into a DataFrame of paths.
+        
+        Files are listed through the `binaryFile` data source with only the
+        `path` column selected, so no file contents are read. Spark's file
+        index lists the top-level directories in parallel (the same code
+        path used for partition discovery) and applies the extension glob in
+        the JVM. How the index lists (IGNORE_LOCALITY_CONF and the
+        LISTING_* confs) comes from the session; those are set when the
+        session is built, not per scan, since syncs may share it.
+        
+        Returns:
+            DataFrame with a `path` string column, or None if no files exist
+        """
+        sc = self.spark.sparkContext
+        jvm = sc._jvm
+        hadoop_conf = sc._jsc.hadoopConfiguration()
+        
+        fs = jvm.org.apache.hadoop.fs.FileSystem.get(
+            jvm.java.net.URI(data_path),
+            hadoop_conf
+        )
+        
+        path = jvm.org.apache.hadoop.fs.Path(data_path)
+        
+        if not fs.exists(path):
+            logger.warning(f"Path does not exist: {data_path}")
+            return None
+        
+        # Each top-level entry (usually a partition directory) becomes its
+        # own root path, so Spark can list them in parallel rather than
+        # descending from a single root
+        root_paths = [
+            status.getPath().toString()
+            for status in fs.listStatus(path)
+            if not status.getPath().getName().startswith(('_', '.'))
+        ]
+        
+        if not root_paths:
+            logger.info(f"Found 0 {file_extension} files")
+            return None
+        
+        reader = self.spark.read.format("binaryFile") \
+            .option("pathGlobFilter", f"*{file_extension}") \
+            .option("recursiveFileLookup", "true")
+        
+        if changed_since is not None:
+            # Spark reads the bound in the reader's timeZone (falling back to
+            # the session time zone), not the driver's, so pin both to UTC
+            reader = reader.option("timeZone", "UTC") \
+                .option("modifiedAfter", _modified_after(changed_since))
+        
+        return reader.load(root_paths).select("path")
+    
+    def _scan_local(
+        self, data_path: str, file_extension: str, changed_since: Optional[float] = None
+    ) -> PathSet:
         """Scan using local filesystem (for testing)."""
         logger.info(f"Scanning local filesystem: {data_path}")
         
-        path = Path(data_path)
+        # Resolved once; every path below is built from it by scandir
+        root = os.path.abspath(data_path)
         
-        if not path.exists():
+        data_files = PathSet()
+        try:
+            names, dirs = self._scan_dir(root, file_extension, changed_since)
+        except FileNotFoundError:
             logger.warning(f"Path does not exist: {data_path}")
-            return set()
+            return data_files
+        data_files.add_names(os.path.join(root, ''), names)
         
-        # Recursively find all files with extension
-        data_files = set()
-        for file_path in path.rglob(f"*{file_extension}"):
-            if file_path.is_file():
-                data_files.add(str(file_path.absolute()))
+        # Directories are listed one level at a time, with every directory
+        # of a level spread across the thread pool, so latency-bound
+        # listings and stats overlap regardless of how the tree is shaped
+        if dirs:
+            with ThreadPoolExecutor(max_workers=self.stat_threads) as executor:
+                while dirs:
+                    next_dirs = []
+                    for path, (names, subdirs) in zip(dirs, executor.map(
+                        lambda path: self._scan_dir(path, file_extension, changed_since),
+                        dirs
+                    )):
+                        data_files.add_names(os.path.join(path, ''), names)
+                        next_dirs.extend(subdirs)
+                    dirs = next_dirs
         
         logger.info(f"Found {len(data_files)} {file_extension} files")
         return data_files
     
+    @staticmethod
+    def _scan_dir(
+        path: str, file_extension: str, changed_since: Optional[float] = None
+    ) -> Tuple[List[str], List[str]]:
+        """
+        List a single directory.
+        
+        DirEntry caches the file type, so no extra stat call is needed per
+        entry unless `changed_since` is given.
+        
+        Returns:
+            Tuple of (matching file names, sub-directory paths)
+        """
+        data_files = []
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(file_extension) and entry.is_file():
+                    if changed_since is None or _changed_at(entry) >= changed_since:
+                        data_files.append(entry.name)
+        return data_files, subdirs
+    
     def get_file_stats(self, file_paths: Set[str]) -> dict:
         """
         Get basic statistics about discovered files.
@@ -1,11 +1,41 @@
 """
 Metadata tracker for Iceberg table operations.
 """
+import hashlib
 import logging
-from typing import Set, Optional
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import orjson
+
+from .path_set import PathSet
+from .utils import calculate_delta_spark
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
 
 logger = logging.getLogger(__name__)
 
+# Spark SQL confs for transferring large metadata collects as Arrow batches
+# when pyarrow is available on the driver; set when the session is built
+ARROW_CONFS = {
+    "spark.sql.execution.arrow.pyspark.enabled": "true",
+    "spark.sql.execution.arrow.maxRecordsPerBatch": "100000",
+}
+
+# Threads used to read manifests missing from the manifest cache
+MANIFEST_READ_THREADS = 8
+
+# Threads used to read parquet footers when registering files; each read is
+# dominated by storage round trips, not CPU
+FOOTER_READ_THREADS = 32
+
 
 class MetadataTracker:
     """
@@ -13,7 +43,13 @@ class MetadataTracker:
     Queries Iceberg's metadata tables to find what files are already tracked.
     """
     
-    def __init__(self, spark_session, catalog_name: str, warehouse_path: str):
+    def __init__(
+        self,
+        spark_session,
+        catalog_name: str,
+        warehouse_path: str,
+        manifest_cache_dir: Optional[str] = None
+    ):
         """
         Initialize metadata tracker.
         
@@ -21,15 +57,150 @@ class MetadataTracker:
             spark_session: SparkSession with Iceberg configured
             catalog_name: Name of Iceberg catalog
             warehouse_path: Path to Iceberg warehouse
+            manifest_cache_dir: Optional directory in which the data file
+                paths of each manifest are cached between runs
         """
         self.spark = spark_session
         self.catalog_name = catalog_name
         self.warehouse_path = warehouse_path
+        self.manifest_cache_dir = Path(manifest_cache_dir) if manifest_cache_dir else None
+        
+        # (db, table) -> (snapshot_id, tracked files at that snapshot)
+        self._files_cache: Dict[Tuple[str, str], Tuple[int, PathSet]] = {}
+        
+        # (db, table) -> whether the table exists, for the tracker's lifetime
+        self._exists_cache: Dict[Tuple[str, str], bool] = {}
+    
+    def _get_current_snapshot_id(self, table_identifier: str) -> Optional[int]:
+        """
+        Get the id of the table's current snapshot, or None if there is none.
+        
+        The newest committed snapshot isn't necessarily current (rollbacks,
+        staged or cherry-picked commits), so this reads the latest snapshot
+        made current on the table's current lineage.
+        """
+        rows = self.spark.sql(f"""
+            SELECT snapshot_id
+            FROM {table_identifier}.history
+            WHERE is_current_ancestor
+            ORDER BY made_current_at DESC
+            LIMIT 1
+        """).collect()
+        
+        return rows[0].snapshot_id if rows else None
+    
+    def get_current_snapshot_id(self, db: str, table: str) -> Optional[int]:
+        """
+        Get the id of the table's current snapshot.
+        
+        Args:
+            db: Database name
+            table: Table name
+        
+        Returns:
+            Snapshot id, or None if the table doesn't exist or has no snapshots
+        """
+        if not self.table_exists(db, table):
+            return None
+        
+        return self._get_current_snapshot_id(f"{self.catalog_name}.{db}.{table}")
+    
+    def get_files_since(
+        self, db: str, table: str, snapshot_id: int
+    ) -> Optional[Tuple[Optional[int], Set[str]]]:
+        """
+        Get data files added to the table after a given snapshot.
+        
+        Only manifest entries written by the snapshots between the given one
+        and the current one are read, following parent ids back from the
+        current snapshot. This is only possible when the given snapshot is an
+        ancestor of the current one and every snapshot in between is a plain
+        append; if the snapshot has expired, was rolled back, or files may
+        have been removed since, None is returned and the caller must read
+        the full file list instead.
+        
+        Args:
+            db: Database name
+            table: Table name
+            snapshot_id: Snapshot the caller's tracked file set reflects
+        
+        Returns:
+            Tuple of (current snapshot id, files added since snapshot_id),
+            or None if an incremental read isn't possible
+        """
+        if not self.table_exists(db, table):
+            return None
+        
+        table_identifier = f"{self.catalog_name}.{db}.{table}"
+        
+        current_id = self._get_current_snapshot_id(table_identifier)
+        snapshots = {
+            row.snapshot_id: row
+            for row in self.spark.sql(f"""
+                SELECT snapshot_id, parent_id, operation
+                FROM {table_identifier}.snapshots
+            """).collect()
+        }
+        
+        # Walk back from the current snapshot; commit times say nothing
+        # about lineage once a table has been rolled back or cherry-picked
+        newer = []
+        ancestor_id = current_id
+        while ancestor_id != snapshot_id:
+            if ancestor_id not in snapshots:
+                logger.info(f"Snapshot {snapshot_id} is not a current ancestor, incremental read not possible")
+                return None
+            newer.append(snapshots[ancestor_id])
+            ancestor_id = snapshots[ancestor_id].parent_id
+        
+        if any(row.operation != 'append' for row in newer):
+            logger.info("Table changed by non-append operations, incremental read not possible")
+            return None
+        
+        if not newer:
+            return snapshot_id, set()
+        
+        newer_ids = ", ".join(str(row.snapshot_id) for row in newer)
+        
+        # Entries keep the id of the snapshot that added the file, even after
+        # manifests are merged; status 2 marks deleted entries
+        added_df = self.spark.sql(f"""
+            SELECT data_file.file_path
+            FROM {table_identifier}.entries
+            WHERE status <> 2 AND snapshot_id IN ({newer_ids})
+        """)
+        added_files = set(self._collect_paths(added_df))
+        
+        logger.info(f"Iceberg added {len(added_files)} files in {len(newer)} snapshots since {snapshot_id}")
+        return current_id, added_files
     
-    def get_tracked_files(self, db: str, table: str) -> Set[str]:
+    def _collect_paths(self, paths_df) -> List[str]:
+        """Collect a single-column DataFrame of paths as a list of strings."""
+        if HAS_ARROW:
+            # Column arrives as a few Arrow record batches instead of a
+            # pickled Row per file
+            return [
+                path
+                for batch in paths_df._collect_as_arrow()
+                for path in batch.column(0).to_pylist()
+            ]
+        
+        # Unwrap the single column on the executors so the driver only
+        # receives plain strings instead of Row objects
+        return paths_df.rdd.map(lambda row: row[0]).collect()
+    
+    def _invalidate_cache(self, db: str, table: str):
+        """Drop cached metadata for a table after it has been modified."""
+        self._files_cache.pop((db, table), None)
+    
+    def get_tracked_files(self, db: str, table: str) -> PathSet:
         """
         Get list of data files currently tracked by Iceberg.
         
+        Results are cached per table and reused until the table's current
+        snapshot changes. With a manifest cache directory, paths are also
+        cached per manifest across runs, so only new manifests are read.
+        
         Args:
             db: Database name
             table: Table name
@@ -39,32 +210,208 @@ class MetadataTracker:
         """
         table_identifier = f"{self.catalog_name}.{db}.{table}"
         
+        if not self.table_exists(db, table):
+            logger.info("Table doesn't exist, will create new table")
+            return PathSet()
+        
         try:
-            # Verify table exists
-            self.spark.sql(f"DESCRIBE TABLE {table_identifier}")
+            snapshot_id = self._get_current_snapshot_id(table_identifier)
+            cached = self._files_cache.get((db, table))
+            if snapshot_id is not None and cached and cached[0] == snapshot_id:
+                logger.info(f"Using cached metadata for snapshot {snapshot_id}")
+                return cached[1]
             
             logger.info(f"Reading Iceberg metadata: {table_identifier}")
             
-            # Query metadata table for tracked files
-            files_df = self.spark.sql(f"""
-                SELECT file_path
-                FROM {table_identifier}.files
-            """)
+            tracked_files = None
+            if self.manifest_cache_dir is not None:
+                try:
+                    tracked_files = self._read_manifests_cached(
+                        table_identifier, self.manifest_cache_dir / f"{db}.{table}"
+                    )
+                except Exception as e:
+                    logger.warning(f"Can't read manifests through the cache: {e}")
             
-            tracked_files = set(row.file_path for row in files_df.collect())
+            if tracked_files is None:
+                # Query metadata table for tracked files
+                files_df = self.spark.sql(f"""
+                    SELECT file_path
+                    FROM {table_identifier}.files
+                """)
+                
+                tracked_files = PathSet(self._collect_paths(files_df))
+            
+            if snapshot_id is not None:
+                self._files_cache[(db, table)] = (snapshot_id, tracked_files)
             
             logger.info(f"Iceberg tracks {len(tracked_files)} files")
             return tracked_files
             
         except Exception as e:
-            logger.warning(f"Table doesn't exist or can't read metadata: {e}")
-            logger.info("Will create new table")
-            return set()
+            logger.warning(f"Can't read table metadata: {e}")
+            return PathSet()
+    
+    def _read_manifests_cached(self, table_identifier: str, cache_dir: Path) -> PathSet:
+        """
+        Read the data files of the current snapshot, one manifest at a time.
+        
+        Manifests are immutable, so the paths listed in each one are cached
+        in `cache_dir` under a hash of the manifest path. Only manifests
+        missing from the cache are read (in parallel); cached manifests no
+        longer in the current snapshot are removed.
+        
+        Returns:
+            Set of absolute file paths tracked by Iceberg
+        """
+        jvm = self.spark.sparkContext._jvm
+        iceberg = jvm.org.apache.iceberg
+        
+        iceberg_table = iceberg.spark.Spark3Util.loadIcebergTable(
+            self.spark._jsparkSession, table_identifier
+        )
+        snapshot = iceberg_table.currentSnapshot()
+        if snapshot is None:
+            return PathSet()
+        io = iceberg_table.io()
+        
+        manifests = {
+            hashlib.sha1(manifest.path().encode()).hexdigest(): manifest
+            for manifest in snapshot.dataManifests(io)
+        }
+        
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with os.scandir(cache_dir) as entries:
+            cached = {entry.name for entry in entries}
+        
+        for name in cached - manifests.keys():
+            try:
+                (cache_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+        
+        tracked_files = PathSet()
+        misses = []
+        for key in manifests:
+            if key not in cached:
+                misses.append(key)
+                continue
+            try:
+                tracked_files.update(orjson.loads(zlib.decompress((cache_dir / key).read_bytes())))
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable manifest cache entry {key}: {e}")
+                misses.append(key)
+        
+        def read_manifest(key: str) -> List[str]:
+            # Joined in the JVM, so each manifest is one Py4J round trip
+            # rather than one per file
+            joined = jvm.java.lang.String.join(
+                "\n", iceberg.ManifestFiles.readPaths(manifests[key], io)
+            )
+            paths = joined.split("\n") if joined else []
+            
+            tmp_file = cache_dir / f"{key}.tmp"
+            tmp_file.write_bytes(zlib.compress(orjson.dumps(paths), 1))
+            tmp_file.replace(cache_dir / key)
+            return paths
+        
+        logger.info(f"Manifest cache: {len(manifests) - len(misses)} hits, {len(misses)} misses")
+        
+        if misses:
+            with ThreadPoolExecutor(max_workers=MANIFEST_READ_THREADS) as executor:
+                for paths in executor.map(read_manifest, misses):
+                    tracked_files.update(paths)
+        
+        return tracked_files
+    
+    def get_tracked_files_df(self, db: str, table: str):
+        """
+        Get the data files tracked by Iceberg as a DataFrame.
+        
+        Nothing is collected, so this is the way to diff tables whose file
+        list is too large for the driver.
+        
+        Args:
+            db: Database name
+            table: Table name
+        
+        Returns:
+            DataFrame with a `path` string column
+        """
+        table_identifier = f"{self.catalog_name}.{db}.{table}"
+        return self.spark.table(f"{table_identifier}.files").selectExpr("file_path AS path")
+    
+    def broadcast_tracked_files(self, db: str, table: str):
+        """
+        Broadcast the set of files tracked by Iceberg to the executors.
+        
+        The paths are broadcast as a plain frozenset so executors can
+        unpickle them without this package on their Python path.
+        
+        Args:
+            db: Database name
+            table: Table name
+        
+        Returns:
+            Broadcast variable wrapping a frozenset of the tracked paths
+        """
+        return self.spark.sparkContext.broadcast(frozenset(self.get_tracked_files(db, table)))
+    
+    def get_untracked_files(
+        self,
+        db: str,
+        table: str,
+        scanned_paths_df,
+        tracked_broadcast=None
+    ) -> Set[str]:
+        """
+        Get scanned files that are not yet tracked by Iceberg.
+        
+        The difference is computed by Spark, so only the new paths are
+        brought back to the driver. By default this is a LEFT ANTI JOIN
+        against {table}.files; when a broadcast of the tracked files is given (see
+        broadcast_tracked_files), each executor filters its partitions
+        against it instead, which avoids the join when the tracked set is
+        small relative to the scanned one.
+        
+        Args:
+            db: Database name
+            table: Table name
+            scanned_paths_df: DataFrame with a single `path` string column
+            tracked_broadcast: Optional broadcast of the tracked file set
+        
+        Returns:
+            Set of absolute file paths not tracked by Iceberg
+        """
+        table_identifier = f"{self.catalog_name}.{db}.{table}"
+        
+        if tracked_broadcast is not None:
+            logger.info(f"Filtering scanned files against broadcast metadata: {table_identifier}")
+            untracked_files = set(scanned_paths_df.rdd.mapPartitions(
+                lambda rows, tracked=tracked_broadcast: (
+                    row[0] for row in rows if row[0] not in tracked.value
+                )
+            ).collect())
+        elif not self.table_exists(db, table):
+            logger.info("Table doesn't exist, all scanned files are new")
+            untracked_files = set(self._collect_paths(scanned_paths_df))
+        else:
+            logger.info(f"Diffing scanned files against Iceberg metadata: {table_identifier}")
+            # DataFrame join rather than a temp view, so concurrent syncs
+            # sharing one SparkSession don't clobber each other's views
+            untracked_files = set(self._collect_paths(calculate_delta_spark(
+                scanned_paths_df, self.get_tracked_files_df(db, table)
+            )))
+        
+        logger.info(f"Found {len(untracked_files)} untracked files")
+        return untracked_files
     
     def table_exists(self, db: str, table: str) -> bool:
         """
         Check if Iceberg table exists.
         
+        The result is cached for the lifetime of the tracker and updated
+        when the table is created through `create_table`.
+        
         Args:
             db: Database name
             table: Table name
@@ -72,13 +419,20 @@ class MetadataTracker:
         Returns:
             True if table exists, False otherwise
         """
+        key = (db, table)
+        if key in self._exists_cache:
+            return self._exists_cache[key]
+        
         table_identifier = f"{self.catalog_name}.{db}.{table}"
         
         try:
             self.spark.sql(f"DESCRIBE TABLE {table_identifier}")
-            return True
+            exists = True
         except:
-            return False
+            exists = False
+        
+        self._exists_cache[key] = exists
+        return exists
     
     def get_table_stats(self, db: str, table: str) -> Optional[dict]:
         """
@@ -96,33 +450,34 @@ class MetadataTracker:
         
         table_identifier = f"{self.catalog_name}.{db}.{table}"
         
-        # Get row count
-        row_count = self.spark.table(table_identifier).count()
-        
-        # Get file stats
-        files_df = self.spark.sql(f"""
-            SELECT 
-                COUNT(*) as file_count,
-                SUM(file_size_in_bytes) as total_size_bytes
-            FROM {table_identifier}.files
-        """)
-        
-        stats_row = files_df.collect()[0]
-        
-        # Get snapshot count
-        snapshots_df = self.spark.sql(f"""
-            SELECT COUNT(*) as snapshot_count
-            FROM {table_identifier}.snapshots
-        """)
-        
-        snapshot_count = snapshots_df.collect()[0].snapshot_count
+        # Get row, file and snapshot stats in a single metadata query.
+        # Row count is summed from per-file record counts (data files only,
+        # content = 0) so no data files are scanned.
+        stats_row = self.spark.sql(f"""
+            SELECT
+                f.row_count,
+                f.file_count,
+                f.total_size_bytes,
+                s.snapshot_count
+            FROM (
+                SELECT 
+                    SUM(CASE WHEN content = 0 THEN record_count ELSE 0 END) as row_count,
+                    COUNT(*) as file_count,
+                    SUM(file_size_in_bytes) as total_size_bytes
+                FROM {table_identifier}.files
+            ) f
+            CROSS JOIN (
+                SELECT COUNT(*) as snapshot_count
+                FROM {table_identifier}.snapshots
+            ) s
+        """).collect()[0]
         
         return {
-            'row_count': row_count,
+            'row_count': stats_row.row_count or 0,
             'file_count': stats_row.file_count,
             'total_size_bytes': stats_row.total_size_bytes,
             'total_size_gb': stats_row.total_size_bytes / (1024**3) if stats_row.total_size_bytes else 0,
-            'snapshot_count': snapshot_count
+            'snapshot_count': stats_row.snapshot_count
         }
     
     def create_table(self, db: str, table: str, dataframe, table_properties: dict = None):
@@ -155,6 +510,8 @@ class MetadataTracker:
             writer = writer.tableProperty(key, str(value))
         
         writer.create()
+        self._invalidate_cache(db, table)
+        self._exists_cache[(db, table)] = True
         
         logger.info(f"Created table: {table_identifier}")
     
@@ -172,6 +529,81 @@ class MetadataTracker:
         logger.info(f"Appending to table: {table_identifier}")
         
         dataframe.writeTo(table_identifier).using("iceberg").append()
+        self._invalidate_cache(db, table)
         
         logger.info(f"Appended data to: {table_identifier}")
-
+    
+    def register_existing_files(self, db: str, table: str, file_paths: List[str]) -> int:
+        """
+        Register existing parquet files with an Iceberg table in place.
+        
+        Files are added to the table's metadata in a single append commit
+        without rewriting any data. Only each file's parquet footer is read
+        (for row counts and column metrics), with up to FOOTER_READ_THREADS
+        reads in flight at once. Partition values of
+        partitioned tables are taken from Hive-style `key=value` directories
+        in the file path.
+        
+        Args:
+            db: Database name
+            table: Table name
+            file_paths: Absolute paths of parquet files to register
+        
+        Returns:
+            Total number of rows in the registered files
+        """
+        table_identifier = f"{self.catalog_name}.{db}.{table}"
+        
+        logger.info(f"Registering {len(file_paths)} files with: {table_identifier}")
+        
+        jvm = self.spark.sparkContext._jvm
+        iceberg = jvm.org.apache.iceberg
+        
+        iceberg_table = iceberg.spark.Spark3Util.loadIcebergTable(
+            self.spark._jsparkSession, table_identifier
+        )
+        spec = iceberg_table.spec()
+        io = iceberg_table.io()
+        metrics_config = iceberg.MetricsConfig.forTable(iceberg_table)
+        # Replicated files carry no Iceberg field ids, so columns are
+        # matched to the table schema by name
+        name_mapping = iceberg.mapping.MappingUtil.create(iceberg_table.schema())
+        
+        def build_data_file(file_path: str):
+            input_file = io.newInputFile(file_path)
+            metrics = iceberg.parquet.ParquetUtil.fileMetrics(
+                input_file, metrics_config, name_mapping
+            )
+            
+            builder = iceberg.DataFiles.builder(spec) \
+                .withPath(file_path) \
+                .withFormat("parquet") \
+                .withFileSizeInBytes(input_file.getLength()) \
+                .withMetrics(metrics)
+            
+            if spec.isPartitioned():
+                partition_path = "/".join(
+                    part for part in file_path.split("/")[:-1] if "=" in part
+                )
+                builder = builder.withPartitionPath(partition_path)
+            
+            return builder.build(), metrics.recordCount()
+        
+        append = iceberg_table.newAppend()
+        row_count = 0
+        
+        # Footers are read concurrently (each Py4J thread gets its own JVM
+        # thread); the append itself is not thread-safe, so files are added
+        # to it from this thread as results arrive
+        with ThreadPoolExecutor(
+            max_workers=min(FOOTER_READ_THREADS, len(file_paths)) or 1
+        ) as executor:
+            for data_file, record_count in executor.map(build_data_file, file_paths):
+                append.appendFile(data_file)
+                row_count += record_count
+        
+        append.commit()
+        self._invalidate_cache(db, table)
+        
+        logger.info(f"Registered {len(file_paths)} files ({row_count:,} rows) with: {table_identifier}")
+        return row_count
@@ -0,0 +1,160 @@
+"""
+Compact set of file paths grouped by parent directory.
+"""
+import sys
+from collections.abc import Set as AbstractSet
+from typing import Dict, Iterable, Iterator, Set, Tuple
+
+
+def _split(path: str) -> Tuple[str, str]:
+    """Split a path into its directory (with trailing slash) and file name."""
+    i = path.rfind('/') + 1
+    return path[:i], path[i:]
+
+
+class PathSet(AbstractSet):
+    """
+    Set of file paths that stores each directory prefix only once.
+    
+    Data files of a table share long directory prefixes, so keeping one
+    prefix string per directory plus the bare file names takes a fraction
+    of the memory of a set of full paths. Full paths are only rebuilt when
+    iterating. Differences and intersections with another PathSet are done
+    directory by directory on the file names.
+    """
+    
+    def __init__(self, paths: Iterable[str] = ()):
+        """
+        Initialize path set.
+        
+        Args:
+            paths: Optional full paths to add
+        """
+        # directory (with trailing slash) -> file names in it
+        self._dirs: Dict[str, Set[str]] = {}
+        self._len = 0
+        self.update(paths)
+    
+    @classmethod
+    def _from_iterable(cls, paths: Iterable[str]) -> 'PathSet':
+        return cls(paths)
+    
+    def add(self, path: str):
+        """Add a full path."""
+        directory, name = _split(path)
+        self.add_names(directory, (name,))
+    
+    def update(self, paths: Iterable[str]):
+        """Add multiple full paths."""
+        for path in paths:
+            self.add(path)
+    
+    def add_names(self, directory: str, names: Iterable[str]):
+        """
+        Add file names from one directory.
+        
+        Args:
+            directory: Directory path, ending with a slash
+            names: File names in the directory
+        """
+        existing = self._dirs.get(directory)
+        if existing is None:
+            # Interned, so sets built from the same tree share one string
+            # per directory and compare keys by identity
+            existing = self._dirs[sys.intern(directory)] = set()
+        before = len(existing)
+        existing.update(names)
+        self._len += len(existing) - before
+        if not existing:
+            del self._dirs[directory]
+    
+    def _adopt(self, directory: str, names: Set[str]):
+        """Take ownership of a new name set for a directory not yet present."""
+        if names:
+            self._dirs[directory] = names
+            self._len += len(names)
+    
+    def __contains__(self, path) -> bool:
+        if not isinstance(path, str):
+            return False
+        directory, name = _split(path)
+        names = self._dirs.get(directory)
+        return names is not None and name in names
+    
+    def __iter__(self) -> Iterator[str]:
+        for directory, names in self._dirs.items():
+            for name in names:
+                yield directory + name
+    
+    def __len__(self) -> int:
+        return self._len
+    
+    def __repr__(self) -> str:
+        return f"PathSet({len(self)} paths in {len(self._dirs)} directories)"
+    
+    def difference(self, other: Iterable[str]) -> 'PathSet':
+        """Paths in this set that are not in `other`."""
+        if not isinstance(other, PathSet):
+            if not isinstance(other, AbstractSet):
+                other = set(other)
+            return PathSet(path for path in self if path not in other)
+        
+        # Each directory's names are diffed by one C-level set operation whose
+        # result is adopted as is; in a steady-state sync most directories
+        # come out empty and are dropped without being copied again
+        result = PathSet()
+        for directory, names in self._dirs.items():
+            other_names = other._dirs.get(directory)
+            result._adopt(directory, names - other_names if other_names else names.copy())
+        return result
+    
+    def intersection(self, other: Iterable[str]) -> 'PathSet':
+        """Paths in both this set and `other`."""
+        if not isinstance(other, PathSet):
+            if not isinstance(other, AbstractSet):
+                other = set(other)
+            return PathSet(path for path in self if path in other)
+        
+        result = PathSet()
+        for directory, names in self._dirs.items():
+            other_names = other._dirs.get(directory)
+            if other_names:
+                result._adopt(directory, names & other_names)
+        return result
+    
+    def copy(self) -> 'PathSet':
+        """Shallow copy; file name strings are shared with the original."""
+        result = PathSet()
+        for directory, names in self._dirs.items():
+            result._adopt(directory, names.copy())
+        return result
+    
+    def union(self, other: Iterable[str]) -> 'PathSet':
+        """Paths in either this set or `other`."""
+        result = self.copy()
+        if isinstance(other, PathSet):
+            for directory, names in other._dirs.items():
+                result.add_names(directory, names)
+        else:
+            for path in other:
+                result.add(path)
+        return result
+    
+    def __sub__(self, other):
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        return self.difference(other)
+    
+    def __and__(self, other):
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        return self.intersection(other)
+    
+    __rand__ = __and__
+    
+    def __or__(self, other):
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        return self.union(other)
+    
+    __ror__ = __or__
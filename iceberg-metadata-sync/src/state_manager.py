@@ -1,19 +1,64 @@
 """
 State manager for tracking sync progress across runs.
 """
-import json
 import logging
+import os
+import shutil
+import zlib
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+from .bloom_filter import ScalableBloomFilter
+from .path_set import PathSet
+from .utils import path_signature
 
 logger = logging.getLogger(__name__)
 
 
+# Number of run records and processed file paths kept in state
+MAX_RUNS = 100
+MAX_PROCESSED_FILES = 10000
+
+# Every processed file is also kept in a Bloom filter, so membership checks
+# cover the full history rather than the retained window. The filter starts
+# sized for this many files and grows as it fills, keeping its false
+# positive rate under the target
+PROCESSED_FILES_BLOOM_CAPACITY = 10000
+PROCESSED_FILES_BLOOM_ERROR_RATE = 0.01
+
+# Format of the persisted tracked-file set; sets written in any other
+# format are ignored, which only costs one full metadata read
+TRACKED_FILES_SCHEMA_VERSION = 4
+
+# The tracked-file set is split by path hash into this many shards (a power
+# of two), so recording new files only rewrites the shards they land in
+TRACKED_FILES_SHARDS = 256
+
+# Lowest zlib level: file paths share long prefixes, so even the fastest
+# setting shrinks the tracked-file set several times over
+TRACKED_FILES_COMPRESSION_LEVEL = 1
+
+
+def _dedupe_recent(items: List[str], max_entries: int) -> List[str]:
+    """Keep the last `max_entries` distinct items, preserving their order."""
+    # dict.fromkeys dedupes in C, keeping the first (i.e. most recent) occurrence
+    recent = list(dict.fromkeys(reversed(items)))[:max_entries]
+    recent.reverse()
+    return recent
+
+
 class StateManager:
     """
     Manages persistent state for incremental syncs.
     Tracks processed files, run history, and sync metadata.
+    
+    Each table has a small JSON summary with the aggregate counters plus two
+    append-only NDJSON logs (run records and processed file paths), so a
+    sync only writes what it adds instead of rewriting the whole history.
     """
     
     def __init__(self, state_dir: str):
@@ -27,9 +72,78 @@ class StateManager:
         self.state_dir.mkdir(parents=True, exist_ok=True)
     
     def _get_state_file(self, db: str, table: str) -> Path:
-        """Get path to state file for a table."""
+        """Get path to state summary file for a table."""
         return self.state_dir / f"state_{db}_{table}.json"
     
+    def _get_runs_file(self, db: str, table: str) -> Path:
+        """Get path to run history log for a table."""
+        return self.state_dir / f"state_{db}_{table}.runs.ndjson"
+    
+    def _get_files_file(self, db: str, table: str) -> Path:
+        """Get path to processed files log for a table."""
+        return self.state_dir / f"state_{db}_{table}.files.ndjson"
+    
+    def _get_bloom_file(self, db: str, table: str) -> Path:
+        """Get path to processed files Bloom filter for a table."""
+        return self.state_dir / f"state_{db}_{table}.bloom"
+    
+    def _get_tracked_dir(self, db: str, table: str) -> Path:
+        """Get path to the directory of the persisted Iceberg tracked-file set."""
+        return self.state_dir / f"state_{db}_{table}.tracked"
+    
+    def _read_log(self, log_file: Path, max_entries: int) -> List:
+        """Read the last `max_entries` records of an NDJSON log."""
+        try:
+            with open(log_file, 'rb') as f:
+                return [orjson.loads(line) for line in deque(f, maxlen=max_entries)]
+        except FileNotFoundError:
+            return []
+    
+    def _append_log(self, log_file: Path, records: List):
+        """Append records to an NDJSON log."""
+        if not records:
+            return
+        
+        with open(log_file, 'ab') as f:
+            f.writelines(orjson.dumps(record) + b'\n' for record in records)
+    
+    def _compact_log(self, log_file: Path, records: List) -> int:
+        """Rewrite an NDJSON log so it only contains `records`."""
+        tmp_file = log_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.writelines(orjson.dumps(record) + b'\n' for record in records)
+        tmp_file.replace(log_file)
+        
+        return len(records)
+    
+    def _load_processed_files(self, state: Dict, db: str, table: str) -> List[str]:
+        """Load the most recent distinct processed file paths, oldest first."""
+        # The log holds at most twice the retention size between compactions
+        return _dedupe_recent(
+            state.get('processed_files', []) +
+            self._read_log(self._get_files_file(db, table), 2 * MAX_PROCESSED_FILES),
+            MAX_PROCESSED_FILES
+        )
+    
+    def _load_summary(self, db: str, table: str) -> Dict:
+        """Load the state summary, or an empty one if none exists."""
+        state_file = self._get_state_file(db, table)
+        
+        # Open directly instead of checking exists() first, saving a stat
+        # call per state file on every load
+        try:
+            state = orjson.loads(state_file.read_bytes())
+            logger.info(f"Loaded state from: {state_file}")
+            logger.info(f"Last run: {state.get('last_run_time', 'Never')}")
+            return state
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Error loading state file: {e}")
+        
+        logger.info("No previous state found, starting fresh")
+        return self._create_empty_state()
+    
     def load_state(self, db: str, table: str) -> Dict:
         """
         Load state from previous run.
@@ -41,20 +155,50 @@ class StateManager:
         Returns:
             State dictionary
         """
-        state_file = self._get_state_file(db, table)
+        state = self._load_summary(db, table)
+        state['runs'] = self._load_history(
+            state, 'runs', self._get_runs_file(db, table), MAX_RUNS
+        )
+        state['processed_files'] = self._load_processed_files(state, db, table)
         
-        if state_file.exists():
-            try:
-                with open(state_file, 'r') as f:
-                    state = json.load(f)
-                    logger.info(f"Loaded state from: {state_file}")
-                    logger.info(f"Last run: {state.get('last_run_time', 'Never')}")
-                    return state
-            except Exception as e:
-                logger.warning(f"Error loading state file: {e}")
+        return state
+    
+    def load_states_batch(self, tables: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        """
+        Load state for many tables at once.
         
-        logger.info("No previous state found, starting fresh")
-        return self._create_empty_state()
+        The state directory is listed once up front, so tables without
+        state files cost no file system calls.
+        
+        Args:
+            tables: List of (db, table) pairs
+        
+        Returns:
+            Dictionary mapping (db, table) to its state dictionary
+        """
+        with os.scandir(self.state_dir) as entries:
+            existing = {entry.name for entry in entries}
+        
+        states = {}
+        for db, table in tables:
+            state_names = (
+                self._get_state_file(db, table).name,
+                self._get_runs_file(db, table).name,
+                self._get_files_file(db, table).name
+            )
+            if any(name in existing for name in state_names):
+                states[(db, table)] = self.load_state(db, table)
+            else:
+                states[(db, table)] = self._create_empty_state()
+        
+        return states
+    
+    def _load_history(self, state: Dict, key: str, log_file: Path, max_entries: int) -> List:
+        """Combine inline history from older state files with the NDJSON log."""
+        return list(deque(
+            state.get(key, []) + self._read_log(log_file, max_entries),
+            maxlen=max_entries
+        ))
     
     def _create_empty_state(self) -> Dict:
         """Create empty state structure."""
@@ -73,7 +217,8 @@ class StateManager:
         new_files_count: int,
         new_rows_count: int,
         new_files: List[str],
-        success: bool = True
+        success: bool = True,
+        scan_time: Optional[float] = None
     ):
         """
         Save state after sync run.
@@ -85,8 +230,10 @@ class StateManager:
             new_rows_count: Number of rows processed in this run
             new_files: List of file paths processed
             success: Whether run was successful
+            scan_time: Unix time the run's filesystem scan started; kept as
+                the lower bound for the next incremental scan if successful
         """
-        state = self.load_state(db, table)
+        state = self._load_summary(db, table)
         
         run_time = datetime.now().isoformat()
         
@@ -96,29 +243,308 @@ class StateManager:
         if success:
             state['total_files_processed'] += new_files_count
             state['total_rows_processed'] += new_rows_count
+            if scan_time is not None:
+                state['last_scan_time'] = scan_time
+        
+        runs_file = self._get_runs_file(db, table)
+        files_file = self._get_files_file(db, table)
+        state_file = self._get_state_file(db, table)
         
-        # Add run record
-        state['runs'].append({
+        # Inline history from older state files is folded into the logs
+        new_runs = state.pop('runs', []) + [{
             'timestamp': run_time,
             'files_processed': new_files_count,
             'rows_processed': new_rows_count,
             'success': success
-        })
-        
-        # Keep last 100 runs
-        state['runs'] = state['runs'][-100:]
+        }]
+        new_processed_files = list(dict.fromkeys(state.pop('processed_files', []) + list(new_files)))
         
-        # Keep track of recently processed files (last 10000)
-        state['processed_files'] = (state.get('processed_files', []) + new_files)[-10000:]
-        
-        # Save to file
-        state_file = self._get_state_file(db, table)
         try:
-            with open(state_file, 'w') as f:
-                json.dump(state, f, indent=2)
+            self._append_log(runs_file, new_runs)
+            self._append_log(files_file, new_processed_files)
+            
+            # Logs are compacted once they reach twice their retention size
+            runs_lines = state.get('runs_log_lines', 0) + len(new_runs)
+            if runs_lines >= 2 * MAX_RUNS:
+                runs_lines = self._compact_log(
+                    runs_file, self._read_log(runs_file, MAX_RUNS)
+                )
+            state['runs_log_lines'] = runs_lines
+            
+            files_lines = state.get('files_log_lines', 0) + len(new_processed_files)
+            if files_lines >= 2 * MAX_PROCESSED_FILES:
+                files_lines = self._compact_log(
+                    files_file, self._load_processed_files(state, db, table)
+                )
+            state['files_log_lines'] = files_lines
+            
+            state_file.write_bytes(orjson.dumps(state, option=orjson.OPT_INDENT_2))
             logger.info(f"Saved state to: {state_file}")
         except Exception as e:
             logger.error(f"Error saving state: {e}")
+            return
+        
+        # The Bloom filter is only an index over the processed files, so it
+        # is updated after the state is saved and a failure here can't lose it
+        if new_processed_files:
+            try:
+                bloom = self._load_bloom(db, table)
+                bloom.update(new_processed_files)
+                self._write_bloom(db, table, bloom)
+            except Exception as e:
+                logger.error(f"Error saving processed files Bloom filter: {e}")
+    
+    def _load_bloom(self, db: str, table: str) -> ScalableBloomFilter:
+        """
+        Load the processed files Bloom filter.
+        
+        An unreadable filter is rebuilt from the retained processed files,
+        so files older than that window are no longer reported as processed.
+        """
+        bloom_file = self._get_bloom_file(db, table)
+        try:
+            return ScalableBloomFilter.load(
+                bloom_file,
+                initial_capacity=PROCESSED_FILES_BLOOM_CAPACITY,
+                error_rate=PROCESSED_FILES_BLOOM_ERROR_RATE
+            )
+        except (OSError, ValueError) as e:
+            logger.warning(f"Rebuilding unreadable Bloom filter {bloom_file}: {e}")
+        
+        bloom = ScalableBloomFilter(
+            initial_capacity=PROCESSED_FILES_BLOOM_CAPACITY,
+            error_rate=PROCESSED_FILES_BLOOM_ERROR_RATE
+        )
+        state = self._load_summary(db, table)
+        bloom.update(self._load_processed_files(state, db, table))
+        return bloom
+    
+    def _write_bloom(self, db: str, table: str, bloom: ScalableBloomFilter):
+        """Atomically replace the processed files Bloom filter."""
+        bloom_file = self._get_bloom_file(db, table)
+        tmp_file = bloom_file.with_suffix('.tmp')
+        tmp_file.write_bytes(bloom.to_bytes())
+        tmp_file.replace(bloom_file)
+    
+    def get_last_scan_time(self, db: str, table: str) -> Optional[float]:
+        """
+        Get the start time of the last successful filesystem scan.
+        
+        Args:
+            db: Database name
+            table: Table name
+        
+        Returns:
+            Unix timestamp, or None if no successful scan has been recorded
+        """
+        return self._load_summary(db, table).get('last_scan_time')
+    
+    def _get_tracked_meta_file(self, tracked_dir: Path) -> Path:
+        """Get path to the snapshot/format record of a tracked-file directory."""
+        return tracked_dir / "meta.json"
+    
+    def _get_tracked_shard_file(self, tracked_dir: Path, shard: int) -> Path:
+        """Get path to one shard of a tracked-file directory."""
+        return tracked_dir / f"shard_{shard:04d}.json.z"
+    
+    def _shard_files(self, files: Iterable[str]) -> Dict[int, List[str]]:
+        """Group file paths by the shard they are stored in."""
+        shards = {}
+        for file_path in files:
+            # crc32 rather than hash(), which is randomized per process
+            shard = zlib.crc32(file_path.encode('utf-8')) & (TRACKED_FILES_SHARDS - 1)
+            shards.setdefault(shard, []).append(file_path)
+        return shards
+    
+    def _read_tracked_shard(self, tracked_dir: Path, shard: int) -> List[str]:
+        """Read the paths in one shard, or none if it hasn't been written."""
+        try:
+            return orjson.loads(zlib.decompress(
+                self._get_tracked_shard_file(tracked_dir, shard).read_bytes()
+            ))
+        except FileNotFoundError:
+            return []
+    
+    def _write_tracked_shard(self, tracked_dir: Path, shard: int, files: List[str]):
+        """Atomically replace one shard."""
+        shard_file = self._get_tracked_shard_file(tracked_dir, shard)
+        tmp_file = shard_file.with_suffix('.tmp')
+        tmp_file.write_bytes(zlib.compress(orjson.dumps(files), TRACKED_FILES_COMPRESSION_LEVEL))
+        tmp_file.replace(shard_file)
+    
+    def _write_tracked_meta(
+        self, tracked_dir: Path, snapshot_id: int, file_count: int, signature: int
+    ):
+        """Record the snapshot, size and signature of the tracked-file shards."""
+        self._get_tracked_meta_file(tracked_dir).write_bytes(orjson.dumps({
+            'schema_version': TRACKED_FILES_SCHEMA_VERSION,
+            'num_shards': TRACKED_FILES_SHARDS,
+            'snapshot_id': snapshot_id,
+            'file_count': file_count,
+            'signature': signature
+        }))
+    
+    def _load_tracked_meta(self, tracked_dir: Path) -> Optional[Dict]:
+        """Load the tracked-file record, or None if missing or in another format."""
+        try:
+            meta = orjson.loads(self._get_tracked_meta_file(tracked_dir).read_bytes())
+        except FileNotFoundError:
+            return None
+        
+        if (meta.get('schema_version') != TRACKED_FILES_SCHEMA_VERSION
+                or meta.get('num_shards') != TRACKED_FILES_SHARDS):
+            logger.info("Ignoring tracked files saved in an older format")
+            return None
+        return meta
+    
+    def load_tracked_files(self, db: str, table: str) -> Tuple[Optional[int], PathSet]:
+        """
+        Load the Iceberg tracked-file set saved by a previous run.
+        
+        Args:
+            db: Database name
+            table: Table name
+        
+        Returns:
+            Tuple of (snapshot id, tracked files), or (None, empty set) if
+            nothing has been saved
+        """
+        tracked_dir = self._get_tracked_dir(db, table)
+        try:
+            meta = self._load_tracked_meta(tracked_dir)
+            if meta is None:
+                return None, PathSet()
+            
+            files = PathSet()
+            for shard in range(TRACKED_FILES_SHARDS):
+                files.update(self._read_tracked_shard(tracked_dir, shard))
+            return meta['snapshot_id'], files
+        except Exception as e:
+            logger.warning(f"Error loading tracked files: {e}")
+            return None, PathSet()
+    
+    def load_tracked_signature(self, db: str, table: str) -> Optional[Tuple[int, int, int]]:
+        """
+        Load the size and signature of the saved tracked-file set without
+        reading the set itself.
+        
+        Args:
+            db: Database name
+            table: Table name
+        
+        Returns:
+            Tuple of (snapshot id, file count, path_signature of the files),
+            or None if nothing has been saved
+        """
+        try:
+            meta = self._load_tracked_meta(self._get_tracked_dir(db, table))
+        except Exception as e:
+            logger.warning(f"Error loading tracked files: {e}")
+            return None
+        
+        if meta is None:
+            return None
+        return meta['snapshot_id'], meta['file_count'], meta['signature']
+    
+    def save_tracked_files(self, db: str, table: str, snapshot_id: int, files: Iterable[str]):
+        """
+        Save the Iceberg tracked-file set as of a snapshot, replacing any
+        saved before.
+        
+        Args:
+            db: Database name
+            table: Table name
+            snapshot_id: Snapshot the file set reflects
+            files: Files tracked by Iceberg at that snapshot
+        """
+        tracked_dir = self._get_tracked_dir(db, table)
+        try:
+            tracked_dir.mkdir(exist_ok=True)
+            
+            # The record is written last, so an interrupted save leaves no
+            # record and the set is read afresh next time
+            try:
+                self._get_tracked_meta_file(tracked_dir).unlink()
+            except FileNotFoundError:
+                pass
+            
+            shards = self._shard_files(files)
+            for shard in range(TRACKED_FILES_SHARDS):
+                if shard in shards:
+                    self._write_tracked_shard(tracked_dir, shard, shards[shard])
+                else:
+                    try:
+                        self._get_tracked_shard_file(tracked_dir, shard).unlink()
+                    except FileNotFoundError:
+                        pass
+            
+            file_count = sum(map(len, shards.values()))
+            signature = path_signature(
+                file_path for shard_files in shards.values() for file_path in shard_files
+            )
+            self._write_tracked_meta(tracked_dir, snapshot_id, file_count, signature)
+            logger.info(f"Saved {file_count} tracked files at snapshot {snapshot_id}")
+        except Exception as e:
+            logger.error(f"Error saving tracked files: {e}")
+    
+    def add_tracked_files(self, db: str, table: str, snapshot_id: int, files: Iterable[str]):
+        """
+        Add files to the saved tracked-file set and advance its snapshot.
+        
+        Only the shards the new files hash to are rewritten. Does nothing
+        if no set has been saved.
+        
+        Args:
+            db: Database name
+            table: Table name
+            snapshot_id: Snapshot the extended file set reflects
+            files: Files added to the table since the saved snapshot
+        """
+        tracked_dir = self._get_tracked_dir(db, table)
+        try:
+            meta = self._load_tracked_meta(tracked_dir)
+            if meta is None:
+                return
+            
+            file_count = meta['file_count']
+            signature = meta['signature']
+            
+            shards = self._shard_files(files)
+            for shard, shard_files in shards.items():
+                existing = self._read_tracked_shard(tracked_dir, shard)
+                merged = list(dict.fromkeys(existing + shard_files))
+                added = merged[len(existing):]
+                if not added:
+                    continue
+                self._write_tracked_shard(tracked_dir, shard, merged)
+                file_count += len(added)
+                signature ^= path_signature(added)
+            
+            # Shards may briefly be ahead of the recorded snapshot, which is
+            # harmless: the files added since it are merged in again
+            self._write_tracked_meta(tracked_dir, snapshot_id, file_count, signature)
+            logger.info(f"Added tracked files to {len(shards)} shards at snapshot {snapshot_id}")
+        except Exception as e:
+            logger.error(f"Error adding tracked files: {e}")
+    
+    def is_file_processed(self, db: str, table: str, file_path: str) -> bool:
+        """
+        Check whether a file has been processed by any previous run.
+        
+        Backed by a Bloom filter covering the full processed history, which
+        grows with it, so it may return a false positive (at under
+        PROCESSED_FILES_BLOOM_ERROR_RATE however many files were processed)
+        but never a false negative.
+        
+        Args:
+            db: Database name
+            table: Table name
+            file_path: File path to check
+        
+        Returns:
+            True if the file was (probably) processed, False otherwise
+        """
+        return file_path in self._load_bloom(db, table)
     
     def get_stats(self, db: str, table: str) -> Dict:
         """
@@ -131,19 +557,20 @@ class StateManager:
         Returns:
             Statistics dictionary
         """
-        state = self.load_state(db, table)
+        state = self._load_summary(db, table)
+        runs = self._load_history(state, 'runs', self._get_runs_file(db, table), MAX_RUNS)
         
-        successful_runs = [r for r in state.get('runs', []) if r['success']]
-        failed_runs = [r for r in state.get('runs', []) if not r['success']]
+        successful_runs = [r for r in runs if r['success']]
+        failed_runs = [r for r in runs if not r['success']]
         
         return {
             'total_files_processed': state.get('total_files_processed', 0),
             'total_rows_processed': state.get('total_rows_processed', 0),
             'last_run_time': state.get('last_run_time'),
-            'total_runs': len(state.get('runs', [])),
+            'total_runs': len(runs),
             'successful_runs': len(successful_runs),
             'failed_runs': len(failed_runs),
-            'recent_runs': state.get('runs', [])[-5:]
+            'recent_runs': runs[-5:]
         }
     
     def clear_state(self, db: str, table: str):
@@ -154,8 +581,19 @@ class StateManager:
             db: Database name
             table: Table name
         """
-        state_file = self._get_state_file(db, table)
-        if state_file.exists():
-            state_file.unlink()
-            logger.info(f"Cleared state: {state_file}")
-
+        for state_file in (
+            self._get_state_file(db, table),
+            self._get_runs_file(db, table),
+            self._get_files_file(db, table),
+            self._get_bloom_file(db, table)
+        ):
+            try:
+                state_file.unlink()
+                logger.info(f"Cleared state: {state_file}")
+            except FileNotFoundError:
+                pass
+        
+        tracked_dir = self._get_tracked_dir(db, table)
+        if tracked_dir.exists():
+            shutil.rmtree(tracked_dir)
+            logger.info(f"Cleared state: {tracked_dir}")
@@ -5,17 +5,36 @@ import argparse
 import logging
 import sys
 import time
+from datetime import datetime
+from functools import cached_property
+from itertools import islice
 from typing import Optional
 
 from pyspark.sql import SparkSession
 
-from .file_scanner import FileScanner
-from .metadata_tracker import MetadataTracker
+from .file_scanner import (
+    DEFAULT_LIST_THREADS,
+    DEFAULT_STAT_THREADS,
+    IGNORE_LOCALITY_CONF,
+    LISTING_PARALLELISM_CONF,
+    LISTING_THRESHOLD_CONF,
+    FileScanner,
+)
+from .metadata_tracker import ARROW_CONFS, HAS_ARROW, MetadataTracker
+from .path_set import PathSet
 from .state_manager import StateManager
-from .utils import calculate_delta, setup_logging, print_summary
+from .utils import calculate_delta, path_signature, setup_logging, print_summary
 
 logger = logging.getLogger(__name__)
 
+# Replication batches land many small files, so pack more of them into each
+# read task than Spark's defaults (128MB per partition, 4MB per file opened)
+DEFAULT_MAX_PARTITION_BYTES = "256MB"
+DEFAULT_OPEN_COST_BYTES = "8MB"
+
+# New files registered per Iceberg commit
+REGISTER_BATCH_SIZE = 10000
+
 
 class IcebergSyncManager:
     """
@@ -30,7 +49,13 @@ class IcebergSyncManager:
         table_name: str,
         warehouse_path: str,
         state_dir: str = "/tmp/iceberg_sync_state",
-        spark_session: Optional[SparkSession] = None
+        spark_session: Optional[SparkSession] = None,
+        incremental_scan: bool = False,
+        stat_threads: int = DEFAULT_STAT_THREADS,
+        list_threads: int = DEFAULT_LIST_THREADS,
+        large_table: bool = False,
+        max_partition_bytes: str = DEFAULT_MAX_PARTITION_BYTES,
+        open_cost_bytes: str = DEFAULT_OPEN_COST_BYTES
     ):
         """
         Initialize sync manager.
@@ -43,29 +68,64 @@ class IcebergSyncManager:
             warehouse_path: Iceberg warehouse path
             state_dir: Directory for state files
             spark_session: Optional existing SparkSession
+            incremental_scan: Only scan files changed since the last
+                successful scan (orphaned files are not detected)
+            stat_threads: Threads used to list directories on local storage
+            list_threads: Parallelism for listing directories through Spark,
+                for a SparkSession created by the manager
+            large_table: Diff scanned files against Iceberg metadata with a
+                Spark join instead of in driver memory (orphaned files are
+                not detected)
+            max_partition_bytes: spark.sql.files.maxPartitionBytes for a
+                SparkSession created by the manager
+            open_cost_bytes: spark.sql.files.openCostInBytes for a
+                SparkSession created by the manager
         """
         self.replicated_base_path = replicated_base_path
         self.catalog_name = catalog_name
         self.db = db
         self.table_name = table_name
         self.warehouse_path = warehouse_path
+        self.incremental_scan = incremental_scan
+        self.large_table = large_table
+        self.max_partition_bytes = max_partition_bytes
+        self.open_cost_bytes = open_cost_bytes
         
         self.table_path = f"{replicated_base_path}/{db}.db/{table_name}"
         self.data_path = f"{self.table_path}/data"
         
-        # Initialize Spark if not provided
-        self.spark = spark_session or self._create_spark_session()
+        self.stat_threads = stat_threads
+        self.list_threads = list_threads
         
-        # Initialize components
-        self.scanner = FileScanner(self.spark)
-        self.metadata = MetadataTracker(self.spark, catalog_name, warehouse_path)
+        # Spark and the components that need it are created on first use,
+        # so state-only operations don't pay for JVM startup
+        self._spark_session = spark_session
+        self.state_dir = state_dir
         self.state = StateManager(state_dir)
     
+    @cached_property
+    def spark(self) -> SparkSession:
+        """SparkSession, created on first use if none was provided."""
+        return self._spark_session or self._create_spark_session()
+    
+    @cached_property
+    def scanner(self) -> FileScanner:
+        """File scanner bound to the SparkSession."""
+        return FileScanner(self.spark, stat_threads=self.stat_threads)
+    
+    @cached_property
+    def metadata(self) -> MetadataTracker:
+        """Metadata tracker bound to the SparkSession."""
+        return MetadataTracker(
+            self.spark, self.catalog_name, self.warehouse_path,
+            manifest_cache_dir=f"{self.state_dir}/manifests"
+        )
+    
     def _create_spark_session(self) -> SparkSession:
         """Create and configure SparkSession for Iceberg."""
         logger.info("Creating SparkSession...")
         
-        return SparkSession.builder \
+        builder = SparkSession.builder \
             .appName(f"Iceberg-Sync-{self.db}.{self.table_name}") \
             .config("spark.jars.packages",
                     "org.apache.iceberg:iceberg-spark-runtime-3.3_2.12:1.2.0") \
@@ -77,7 +137,24 @@ class IcebergSyncManager:
             .config(f"spark.sql.catalog.{self.catalog_name}.warehouse",
                     self.warehouse_path) \
             .config("spark.sql.adaptive.enabled", "true") \
-            .getOrCreate()
+            .config("spark.sql.adaptive.coalescePartitions.enabled", "true") \
+            .config("spark.sql.adaptive.advisoryPartitionSizeInBytes", "64m") \
+            .config("spark.sql.adaptive.coalescePartitions.minPartitionSize", "16m") \
+            .config("spark.sql.parquet.enableVectorizedReader", "true") \
+            .config("spark.sql.parquet.mergeSchema", "false") \
+            .config("spark.sql.parquet.filterPushdown", "true") \
+            .config("spark.sql.parquet.aggregatePushdown", "true") \
+            .config("spark.sql.files.maxPartitionBytes", self.max_partition_bytes) \
+            .config("spark.sql.files.openCostInBytes", self.open_cost_bytes) \
+            .config(IGNORE_LOCALITY_CONF, "true") \
+            .config(LISTING_THRESHOLD_CONF, "1") \
+            .config(LISTING_PARALLELISM_CONF, str(self.list_threads))
+        
+        if HAS_ARROW:
+            for key, value in ARROW_CONFS.items():
+                builder = builder.config(key, value)
+        
+        return builder.getOrCreate()
     
     def sync(self) -> bool:
         """
@@ -98,36 +175,87 @@ class IcebergSyncManager:
         try:
             # Step 1: Scan filesystem for data files
             logger.info("\n[1/5] Scanning filesystem for data files...")
-            current_files = self.scanner.scan_data_files(self.data_path)
+            scan_time = time.time()
+            changed_since = None
+            if self.incremental_scan:
+                changed_since = self.state.get_last_scan_time(self.db, self.table_name)
             
-            if not current_files:
+            if changed_since is not None:
+                logger.info(f"Scanning files changed since {datetime.fromtimestamp(changed_since).isoformat()}")
+            
+            if self.large_table:
+                current_files = self.scanner.scan_data_files_df(
+                    self.data_path, changed_since=changed_since
+                )
+            elif changed_since is not None:
+                current_files = self.scanner.scan_data_files_since(self.data_path, changed_since)
+            else:
+                current_files = self.scanner.scan_data_files(self.data_path)
+            
+            # The large-table scan returns None when there is nothing to list,
+            # so no Spark job is needed just to check for files
+            if current_files is None or (not self.large_table and not current_files):
+                if changed_since is not None:
+                    logger.info("✅ No changed files found - metadata is up to date")
+                    self.state.save_state(
+                        self.db, self.table_name,
+                        new_files_count=0,
+                        new_rows_count=0,
+                        new_files=[],
+                        success=True,
+                        scan_time=scan_time
+                    )
+                    return True
+                
                 logger.warning("No data files found in filesystem!")
                 return False
             
-            # Step 2: Get files tracked by Iceberg
-            logger.info("\n[2/5] Querying Iceberg metadata...")
-            tracked_files = self.metadata.get_tracked_files(self.db, self.table_name)
-            
-            # Step 3: Calculate delta
-            logger.info("\n[3/5] Calculating delta...")
-            delta = calculate_delta(current_files, tracked_files)
+            if self.large_table:
+                # Steps 2 and 3 run as one Spark join, so neither the scanned
+                # nor the tracked file list is held on the driver
+                logger.info("\n[2/5] Querying Iceberg metadata...")
+                logger.info("\n[3/5] Calculating delta with Spark...")
+                new_files = self.metadata.get_untracked_files(
+                    self.db, self.table_name, current_files
+                )
+            elif changed_since is None and self._matches_tracked_signature(current_files):
+                logger.info("\n[2/5] Querying Iceberg metadata...")
+                logger.info("\n[3/5] Scanned files match the saved tracked-file signature")
+                new_files = ()
+            else:
+                # Step 2: Get files tracked by Iceberg
+                logger.info("\n[2/5] Querying Iceberg metadata...")
+                tracked_files = self._get_tracked_files()
+                
+                if changed_since is not None:
+                    # Only changed files were scanned, so compare against the
+                    # tracked files among them rather than the whole table
+                    tracked_files = tracked_files & current_files
+                
+                # Step 3: Calculate delta
+                logger.info("\n[3/5] Calculating delta...")
+                delta = calculate_delta(current_files, tracked_files)
+                
+                print_summary(delta)
+                new_files = delta['new_files']
             
-            print_summary(delta)
+            new_count = len(new_files)
             
-            if delta['new_count'] == 0:
+            if new_count == 0:
                 logger.info("✅ No new files to process - metadata is up to date")
                 self.state.save_state(
                     self.db, self.table_name,
                     new_files_count=0,
                     new_rows_count=0,
                     new_files=[],
-                    success=True
+                    success=True,
+                    scan_time=scan_time
                 )
                 return True
             
             # Step 4: Process new files
-            logger.info(f"\n[4/5] Processing {delta['new_count']} new files...")
-            success, rows_processed = self._process_new_files(delta['new_files'])
+            logger.info(f"\n[4/5] Processing {new_count} new files...")
+            success, rows_processed = self._process_new_files(new_files)
             
             if not success:
                 logger.error("❌ Failed to process new files")
@@ -138,10 +266,11 @@ class IcebergSyncManager:
             self.state.save_state(
                 self.db,
                 self.table_name,
-                new_files_count=delta['new_count'],
+                new_files_count=new_count,
                 new_rows_count=rows_processed,
-                new_files=sorted(list(delta['new_files'])),
-                success=True
+                new_files=new_files,
+                success=True,
+                scan_time=scan_time
             )
             
             # Final summary
@@ -149,7 +278,7 @@ class IcebergSyncManager:
             logger.info("="*80)
             logger.info("✅ Sync Completed Successfully!")
             logger.info("="*80)
-            logger.info(f"Files processed: {delta['new_count']:,}")
+            logger.info(f"Files processed: {new_count:,}")
             logger.info(f"Rows processed:  {rows_processed:,}")
             logger.info(f"Runtime:         {elapsed:.2f} seconds")
             logger.info("="*80)
@@ -167,12 +296,80 @@ class IcebergSyncManager:
             )
             return False
     
+    def _get_tracked_files(self) -> PathSet:
+        """
+        Get files tracked by Iceberg, incrementally where possible.
+        
+        The tracked-file set saved by the previous run is extended with the
+        files appended since its snapshot; the full file list is only read
+        when there is no saved set or the table was changed by anything
+        other than appends.
+        
+        Returns:
+            Set of file paths tracked by Iceberg
+        """
+        snapshot_id, tracked_files = self.state.load_tracked_files(self.db, self.table_name)
+        
+        if snapshot_id is not None:
+            since = self.metadata.get_files_since(self.db, self.table_name, snapshot_id)
+            if since is not None:
+                current_snapshot_id, added_files = since
+                if added_files:
+                    tracked_files |= added_files
+                    self.state.add_tracked_files(
+                        self.db, self.table_name, current_snapshot_id, added_files
+                    )
+                logger.info(f"Iceberg tracks {len(tracked_files)} files (incremental)")
+                return tracked_files
+        
+        # Snapshot is read before the file list, so a concurrent commit can
+        # only make the saved set newer than its snapshot, never older
+        current_snapshot_id = self.metadata.get_current_snapshot_id(self.db, self.table_name)
+        tracked_files = self.metadata.get_tracked_files(self.db, self.table_name)
+        if current_snapshot_id is not None:
+            self.state.save_tracked_files(
+                self.db, self.table_name, current_snapshot_id, tracked_files
+            )
+        
+        return tracked_files
+    
+    def _matches_tracked_signature(self, current_files: PathSet) -> bool:
+        """
+        Check whether the scanned files are exactly the saved tracked files.
+        
+        Compares only the size and signature saved with the tracked-file set,
+        so an unchanged table is confirmed without loading that set or
+        diffing against it. Only valid while the table is still at the
+        snapshot the set was saved for.
+        
+        Args:
+            current_files: Complete set of scanned files
+        
+        Returns:
+            True if there is nothing new to process
+        """
+        saved = self.state.load_tracked_signature(self.db, self.table_name)
+        if saved is None:
+            return False
+        
+        snapshot_id, file_count, signature = saved
+        if file_count != len(current_files):
+            return False
+        if self.metadata.get_current_snapshot_id(self.db, self.table_name) != snapshot_id:
+            return False
+        return path_signature(current_files) == signature
+    
     def _process_new_files(self, new_files) -> tuple:
         """
         Process new files and update Iceberg metadata.
         
+        Files are registered in batches of REGISTER_BATCH_SIZE, one Iceberg
+        commit each, so only one batch of footer metadata is held at a time.
+        If a batch fails, the batches committed before it stay registered
+        and are no longer new on the next run.
+        
         Args:
-            new_files: Set of new file paths
+            new_files: Collection of new file paths
         
         Returns:
             Tuple of (success: bool, rows_processed: int)
@@ -180,32 +377,42 @@ class IcebergSyncManager:
         if not new_files:
             return True, 0
         
-        # Convert set to sorted list
-        new_files_list = sorted(list(new_files))
-        
-        # Show sample
-        logger.info(f"Sample files to process:")
-        for f in new_files_list[:3]:
-            logger.info(f"  - {f}")
-        if len(new_files_list) > 3:
-            logger.info(f"  ... and {len(new_files_list) - 3} more")
+        # Show sample (files are processed in no particular order, so the
+        # sample is not sorted either)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Sample files to process:")
+            for f in islice(new_files, 3):
+                logger.info("  - %s", f)
+            if len(new_files) > 3:
+                logger.info("  ... and %d more", len(new_files) - 3)
         
         try:
-            # Read only new files
-            df = self.spark.read.parquet(*new_files_list)
-            row_count = df.count()
-            
-            logger.info(f"✅ Read {row_count:,} rows from {len(new_files_list)} files")
-            
             # Check if table exists
             table_exists = self.metadata.table_exists(self.db, self.table_name)
             
             if not table_exists:
+                # Only the schema is read; the new files are registered below
                 logger.info("Creating new Iceberg table...")
-                self.metadata.create_table(self.db, self.table_name, df)
-            else:
-                logger.info("Appending to existing Iceberg table...")
-                self.metadata.append_to_table(self.db, self.table_name, df)
+                schema_df = self.spark.read.parquet(next(iter(new_files))).limit(0)
+                self.metadata.create_table(self.db, self.table_name, schema_df)
+            
+            # Register files in place from their parquet footers instead of
+            # reading and rewriting the data
+            logger.info("Registering new files with Iceberg table...")
+            row_count = 0
+            registered = 0
+            files = iter(new_files)
+            while True:
+                batch = list(islice(files, REGISTER_BATCH_SIZE))
+                if not batch:
+                    break
+                row_count += self.metadata.register_existing_files(
+                    self.db, self.table_name, batch
+                )
+                registered += len(batch)
+                logger.info("Registered %d/%d files", registered, len(new_files))
+            
+            logger.info(f"✅ Registered {row_count:,} rows from {len(new_files)} files")
             
             # Verify
             stats = self.metadata.get_table_stats(self.db, self.table_name)
@@ -218,23 +425,18 @@ class IcebergSyncManager:
             logger.error(f"Error processing files: {e}", exc_info=True)
             return False, 0
     
-    def get_stats(self):
-        """Print statistics about table and sync history."""
+    def get_stats(self, include_iceberg: bool = True):
+        """
+        Print statistics about table and sync history.
+        
+        Args:
+            include_iceberg: Also query the Iceberg table, which needs a
+                SparkSession; sync history is read from local state only
+        """
         print("\n" + "="*80)
         print(f"Statistics: {self.catalog_name}.{self.db}.{self.table_name}")
         print("="*80)
         
-        # Iceberg table stats
-        iceberg_stats = self.metadata.get_table_stats(self.db, self.table_name)
-        if iceberg_stats:
-            print("\nIceberg Table:")
-            print(f"  Rows:      {iceberg_stats['row_count']:,}")
-            print(f"  Files:     {iceberg_stats['file_count']:,}")
-            print(f"  Size:      {iceberg_stats['total_size_gb']:.2f} GB")
-            print(f"  Snapshots: {iceberg_stats['snapshot_count']:,}")
-        else:
-            print("\nIceberg Table: Not found")
-        
         # State stats
         state_stats = self.state.get_stats(self.db, self.table_name)
         print("\nSync History:")
@@ -245,6 +447,20 @@ class IcebergSyncManager:
         print(f"  Failed runs:           {state_stats['failed_runs']}")
         print(f"  Last run:              {state_stats['last_run_time'] or 'Never'}")
         
+        # Iceberg table stats
+        if not include_iceberg:
+            print("\nIceberg Table: (Spark not initialized)")
+        else:
+            iceberg_stats = self.metadata.get_table_stats(self.db, self.table_name)
+            if iceberg_stats:
+                print("\nIceberg Table:")
+                print(f"  Rows:      {iceberg_stats['row_count']:,}")
+                print(f"  Files:     {iceberg_stats['file_count']:,}")
+                print(f"  Size:      {iceberg_stats['total_size_gb']:.2f} GB")
+                print(f"  Snapshots: {iceberg_stats['snapshot_count']:,}")
+            else:
+                print("\nIceberg Table: Not found")
+        
         print("="*80 + "\n")
 
 
@@ -267,6 +483,20 @@ def main():
                        help='Directory for state files')
     parser.add_argument('--stats', action='store_true',
                        help='Show statistics only (no sync)')
+    parser.add_argument('--no-spark', action='store_true',
+                       help='With --stats, only show sync history without starting Spark')
+    parser.add_argument('--incremental-scan', action='store_true',
+                       help='Only scan files changed since the last successful scan')
+    parser.add_argument('--stat-threads', type=int, default=DEFAULT_STAT_THREADS,
+                       help='Threads used to list directories on local storage')
+    parser.add_argument('--list-threads', type=int, default=DEFAULT_LIST_THREADS,
+                       help='Parallelism for listing directories through Spark')
+    parser.add_argument('--large-table', action='store_true',
+                       help='Diff scanned files against Iceberg metadata with a Spark join')
+    parser.add_argument('--max-partition-bytes', default=DEFAULT_MAX_PARTITION_BYTES,
+                       help='Maximum bytes packed into one Spark read partition')
+    parser.add_argument('--open-cost-bytes', default=DEFAULT_OPEN_COST_BYTES,
+                       help='Estimated cost of opening a file, in bytes, when packing partitions')
     parser.add_argument('--log-level', default='INFO',
                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
                        help='Logging level')
@@ -283,11 +513,17 @@ def main():
         db=args.database,
         table_name=args.table,
         warehouse_path=args.warehouse,
-        state_dir=args.state_dir
+        state_dir=args.state_dir,
+        incremental_scan=args.incremental_scan,
+        stat_threads=args.stat_threads,
+        list_threads=args.list_threads,
+        large_table=args.large_table,
+        max_partition_bytes=args.max_partition_bytes,
+        open_cost_bytes=args.open_cost_bytes
     )
     
     if args.stats:
-        manager.get_stats()
+        manager.get_stats(include_iceberg=not args.no_spark)
         sys.exit(0)
     else:
         success = manager.sync()
@@ -1,35 +1,90 @@
 """
 Utility functions for Iceberg metadata sync.
 """
+import hashlib
 import logging
-from typing import Set
+from typing import AbstractSet, Iterable
 
 
-def calculate_delta(current_files: Set[str], tracked_files: Set[str]) -> dict:
+def calculate_delta(
+    current_files: AbstractSet[str],
+    tracked_files: AbstractSet[str],
+    compute_common: bool = False,
+    include_files: bool = True
+) -> dict:
     """
     Calculate differences between filesystem and Iceberg metadata.
     
     Args:
         current_files: Files found in filesystem
         tracked_files: Files tracked by Iceberg
+        compute_common: Also build the set of files present in both (the
+            count is always included, since it follows from the other two)
+        include_files: Include the new and orphaned file sets; without them
+            only one set difference is needed, as the orphaned count
+            follows from the new count
     
     Returns:
         Dictionary with delta statistics
     """
-    new_files = current_files - tracked_files
-    orphaned_files = tracked_files - current_files
-    common_files = current_files & tracked_files
-    
-    return {
-        'new_files': new_files,
-        'orphaned_files': orphaned_files,
-        'common_files': common_files,
+    new_files = current_files.difference(tracked_files)
+    common_count = len(current_files) - len(new_files)
+    
+    delta = {
         'new_count': len(new_files),
-        'orphaned_count': len(orphaned_files),
-        'common_count': len(common_files),
+        'orphaned_count': len(tracked_files) - common_count,
+        'common_count': common_count,
         'total_current': len(current_files),
         'total_tracked': len(tracked_files)
     }
+    
+    if include_files:
+        delta['new_files'] = new_files
+        delta['orphaned_files'] = tracked_files.difference(current_files)
+    
+    if compute_common:
+        delta['common_files'] = current_files.intersection(tracked_files)
+    
+    return delta
+
+
+def path_signature(paths: Iterable[str]) -> int:
+    """
+    Order-independent 64-bit signature of a set of paths.
+    
+    The XOR of each path's 64-bit BLAKE2b digest, so it can be updated as
+    paths are added without revisiting the rest, and two sets can be
+    compared by signature and size without holding both.
+    
+    Args:
+        paths: Distinct file paths
+    
+    Returns:
+        Signature as an unsigned 64-bit integer
+    """
+    signature = 0
+    for path in paths:
+        signature ^= int.from_bytes(
+            hashlib.blake2b(path.encode('utf-8'), digest_size=8).digest(), 'little'
+        )
+    return signature
+
+
+def calculate_delta_spark(current_df, tracked_df):
+    """
+    Find new files with a distributed LEFT ANTI JOIN.
+    
+    Unlike calculate_delta, neither file list has to be held on the driver;
+    only the result needs to be collected.
+    
+    Args:
+        current_df: DataFrame of files found in filesystem, with a `path` column
+        tracked_df: DataFrame of files tracked by Iceberg, with a `path` column
+    
+    Returns:
+        DataFrame of the `path`s in current_df that are not in tracked_df
+    """
+    return current_df.join(tracked_df, "path", "left_anti")
 
 
 def setup_logging(log_level: str = "INFO", log_file: str = None):
@@ -77,19 +132,24 @@ def print_summary(delta: dict, run_time_seconds: float = None):
         delta: Delta dictionary from calculate_delta
         run_time_seconds: Optional runtime duration
     """
-    print("\n" + "="*80)
-    print("Sync Summary")
-    print("="*80)
-    print(f"Files in filesystem:      {delta['total_current']:,}")
-    print(f"Files tracked by Iceberg: {delta['total_tracked']:,}")
-    print(f"New files to process:     {delta['new_count']:,}")
+    lines = [
+        "\n" + "="*80,
+        "Sync Summary",
+        "="*80,
+        f"Files in filesystem:      {delta['total_current']:,}",
+        f"Files tracked by Iceberg: {delta['total_tracked']:,}",
+        f"New files to process:     {delta['new_count']:,}",
+    ]
     
     if delta['orphaned_count'] > 0:
-        print(f"⚠️  Orphaned files:         {delta['orphaned_count']:,}")
-        print("   (tracked by Iceberg but not in filesystem)")
+        lines.append(f"⚠️  Orphaned files:         {delta['orphaned_count']:,}")
+        lines.append("   (tracked by Iceberg but not in filesystem)")
     
     if run_time_seconds:
-        print(f"\nRuntime: {run_time_seconds:.2f} seconds")
+        lines.append(f"\nRuntime: {run_time_seconds:.2f} seconds")
+    
+    lines.append("="*80 + "\n")
     
-    print("="*80 + "\n")
+    # One write for the whole block rather than one per line
+    print("\n".join(lines))
 
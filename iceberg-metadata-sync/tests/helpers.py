@@ -0,0 +1,6 @@
+"""Shared helpers for the test suites."""
+import os
+
+# Test trees go on tmpfs where available; the tests are all small-file
+# metadata operations
+TEST_TMP_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
@@ -357,6 +357,36 @@ class TestEndToEndReplication(unittest.TestCase):
         self.assertTrue(tracker.table_exists(self.db, self.table))
         print(f"  ✅ Created and verified Iceberg table")
         
+        untracked = tracker.get_untracked_files(
+            self.db, self.table, scanner.to_dataframe(found_files)
+        )
+        self.assertEqual(untracked, found_files, "Replicated files should be untracked")
+        
+        tracked_broadcast = tracker.broadcast_tracked_files(self.db, self.table)
+        untracked = tracker.get_untracked_files(
+            self.db, self.table, scanner.to_dataframe(found_files), tracked_broadcast
+        )
+        self.assertEqual(untracked, found_files, "Broadcast filter should match the anti-join")
+        
+        untracked = tracker.get_untracked_files(
+            self.db, self.table, scanner.scan_data_files_df(str(dr_data_path))
+        )
+        self.assertEqual(untracked, found_files, "Uncollected scan should match the collected one")
+        
+        cached_tracker = MetadataTracker(
+            self.spark, "test_catalog", str(self.dr_warehouse),
+            manifest_cache_dir=f"{self.state_dir}/manifests"
+        )
+        for _ in range(2):  # cold, then warm cache
+            self.assertEqual(
+                cached_tracker.get_tracked_files(self.db, self.table),
+                MetadataTracker(self.spark, "test_catalog", str(self.dr_warehouse))
+                    .get_tracked_files(self.db, self.table),
+                "Manifest cache should match the files metadata table"
+            )
+            cached_tracker._invalidate_cache(self.db, self.table)
+        print(f"  ✅ Found {len(untracked)} untracked files")
+        
         # Test StateManager
         print("\n[Test] StateManager...")
         state_mgr = StateManager(self.state_dir)
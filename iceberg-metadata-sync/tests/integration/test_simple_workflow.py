@@ -2,14 +2,88 @@
 Simple integration test using mock Spark for local testing.
 Tests the workflow without requiring full Iceberg dependencies.
 """
+import os
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import tempfile
 import shutil
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 from src.file_scanner import FileScanner
 from src.state_manager import StateManager
 from src.utils import calculate_delta
+from tests.helpers import TEST_TMP_DIR
+
+
+def _count_parquet(root) -> int:
+    """Count parquet files under a directory without building Path objects."""
+    count = 0
+    stack = [str(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.parquet'):
+                    count += 1
+    return count
+
+
+# ioctl request that clones one file's extents into another (Linux FICLONE)
+FICLONE = 0x40049409
+
+
+def _clone_file(src, dst, *, follow_symlinks=True):
+    """
+    Copy a file without a user-space read/write loop.
+    
+    Clones the file on copy-on-write filesystems and otherwise copies it
+    in the kernel with copy_file_range, falling back to a plain copy.
+    Used as the copytree copy function, so metadata is copied as with copy2.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        try:
+            if fcntl is None:
+                raise OSError("File cloning is not supported on this platform")
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            try:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 2 ** 30):
+                    pass
+            except (AttributeError, OSError):
+                fdst.seek(0)
+                fdst.truncate()
+                fsrc.seek(0)
+                shutil.copyfileobj(fsrc, fdst)
+    shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
+    return dst
+
+
+def _touch_dummy(file_path, i: int):
+    """Write a small dummy parquet file as raw bytes."""
+    fd = os.open(str(file_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, b"dummy parquet data for file %d" % i)
+    finally:
+        os.close(fd)
+
+
+def _touch_dummies(output_path: Path, indices):
+    """Create numbered dummy parquet files in parallel; returns their paths."""
+    indices = list(indices)
+    file_paths = [output_path / f"data_{i:04d}.parquet" for i in indices]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(_touch_dummy, file_paths, indices))
+    return file_paths
 
 
 class TestSimpleIntegration(unittest.TestCase):
@@ -18,10 +92,20 @@ class TestSimpleIntegration(unittest.TestCase):
     Tests the core workflow of file discovery and state management.
     """
     
+    @classmethod
+    def setUpClass(cls):
+        """Create one temporary root shared by all tests."""
+        cls.test_root = tempfile.mkdtemp(dir=TEST_TMP_DIR)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up test environment."""
+        shutil.rmtree(cls.test_root)
+    
     def setUp(self):
         """Set up test environment."""
-        self.test_root = tempfile.mkdtemp()
-        self.test_path = Path(self.test_root)
+        # Each test works in its own directory under the shared root
+        self.test_path = Path(self.test_root) / self.id().split('.')[-1]
         
         # Simulate source and DR locations
         self.source_warehouse = self.test_path / "source" / "warehouse"
@@ -46,10 +130,6 @@ class TestSimpleIntegration(unittest.TestCase):
         print(f"  DR:      {self.dr_table_path}")
         print(f"{'='*60}\n")
     
-    def tearDown(self):
-        """Clean up test environment."""
-        shutil.rmtree(self.test_root)
-    
     def _create_dummy_parquet_files(self, output_path: Path, num_files: int = 3):
         """
         Create dummy parquet files (just empty files with .parquet extension).
@@ -63,12 +143,7 @@ class TestSimpleIntegration(unittest.TestCase):
         """
         output_path.mkdir(parents=True, exist_ok=True)
         
-        created_files = []
-        
-        for i in range(num_files):
-            file_path = output_path / f"data_{i:04d}.parquet"
-            file_path.write_text(f"dummy parquet data for file {i}")
-            created_files.append(file_path)
+        created_files = _touch_dummies(output_path, range(num_files))
         
         print(f"Created {len(created_files)} dummy parquet files")
         return created_files
@@ -80,6 +155,9 @@ class TestSimpleIntegration(unittest.TestCase):
         Args:
             source_path: Source directory
             dest_path: Destination directory
+        
+        Returns:
+            Paths of the replicated parquet files
         """
         print(f"\n📦 Simulating block replication:")
         print(f"   {source_path} -> {dest_path}")
@@ -87,15 +165,24 @@ class TestSimpleIntegration(unittest.TestCase):
         if dest_path.exists():
             shutil.rmtree(dest_path)
         
-        shutil.copytree(source_path, dest_path)
+        # The copied files are recorded as they are copied, like a
+        # replication tool's transfer report, so callers needn't rescan
+        replicated = []
+        
+        def copy_and_record(src, dst, *, follow_symlinks=True):
+            if dst.endswith('.parquet'):
+                replicated.append(dst)
+            return _clone_file(src, dst, follow_symlinks=follow_symlinks)
+        
+        shutil.copytree(source_path, dest_path, copy_function=copy_and_record)
         
         # Verify replication
-        source_files = list(source_path.rglob("*.parquet"))
-        dest_files = list(dest_path.rglob("*.parquet"))
+        source_count = _count_parquet(source_path)
         
-        print(f"   ✅ Replicated {len(dest_files)} files")
+        print(f"   ✅ Replicated {len(replicated)} files")
         
-        assert len(source_files) == len(dest_files), "Replication file count mismatch"
+        assert source_count == len(replicated), "Replication file count mismatch"
+        return replicated
     
     def test_01_file_discovery_after_replication(self):
         """Test file discovery in replicated location."""
@@ -136,14 +223,13 @@ class TestSimpleIntegration(unittest.TestCase):
         # Initial setup: 3 files
         source_data_path = self.source_table_path / "data"
         self._create_dummy_parquet_files(source_data_path, num_files=3)
-        self._simulate_block_replication(self.source_table_path, self.dr_table_path)
+        replicated = self._simulate_block_replication(self.source_table_path, self.dr_table_path)
         
         scanner = FileScanner(spark_session=None)
-        dr_data_path = self.dr_table_path / "data"
         
         # First scan
         print("\n[Phase 1] Initial scan...")
-        initial_files = scanner.scan_data_files(str(dr_data_path))
+        initial_files = scanner.scan_entries(replicated)
         print(f"   Found {len(initial_files)} files initially")
         
         # Simulate these were tracked by Iceberg
@@ -151,22 +237,20 @@ class TestSimpleIntegration(unittest.TestCase):
         
         # Add more files at source
         print("\n[Phase 2] Adding 2 more files at source...")
-        for i in range(3, 5):
-            file_path = source_data_path / f"data_{i:04d}.parquet"
-            file_path.write_text(f"dummy parquet data for file {i}")
+        _touch_dummies(source_data_path, range(3, 5))
         
         # Replicate again
         print("\n[Phase 3] Replicating to DR...")
-        self._simulate_block_replication(self.source_table_path, self.dr_table_path)
+        replicated = self._simulate_block_replication(self.source_table_path, self.dr_table_path)
         
-        # Second scan
+        # Second scan, from the replicated file list
         print("\n[Phase 4] Scanning after replication...")
-        current_files = scanner.scan_data_files(str(dr_data_path))
+        current_files = scanner.scan_entries(replicated)
         print(f"   Found {len(current_files)} files total")
         
         # Calculate delta
         print("\n[Phase 5] Calculating delta...")
-        delta = calculate_delta(current_files, tracked_files)
+        delta = calculate_delta(current_files, tracked_files, include_files=False)
         
         print(f"\n📊 Delta Results:")
         print(f"   Total current:  {delta['total_current']}")
@@ -256,10 +340,10 @@ class TestSimpleIntegration(unittest.TestCase):
         
         # Create and replicate
         self._create_dummy_parquet_files(source_data_path, num_files=3)
-        self._simulate_block_replication(self.source_table_path, self.dr_table_path)
+        replicated = self._simulate_block_replication(self.source_table_path, self.dr_table_path)
         
         # Scan
-        current_files = scanner.scan_data_files(str(dr_data_path))
+        current_files = scanner.scan_entries(replicated)
         tracked_files = set()  # No files tracked yet
         
         # Calculate delta
@@ -270,8 +354,9 @@ class TestSimpleIntegration(unittest.TestCase):
         state_mgr.save_state(self.db, self.table, delta['new_count'], 
                             delta['new_count'] * 100, list(delta['new_files']), True)
         
-        # Update tracked files (simulating Iceberg metadata update)
-        tracked_files = current_files.copy()
+        # Update tracked files (simulating Iceberg metadata update) by
+        # applying the delta rather than re-snapshotting everything
+        tracked_files |= delta['new_files']
         
         print(f"  ✅ Sync 1 complete: {delta['new_count']} files processed")
         
@@ -280,15 +365,13 @@ class TestSimpleIntegration(unittest.TestCase):
         print("-" * 60)
         
         # Add more files
-        for i in range(3, 5):
-            file_path = source_data_path / f"data_{i:04d}.parquet"
-            file_path.write_text(f"dummy data {i}")
+        _touch_dummies(source_data_path, range(3, 5))
         
         # Replicate
-        self._simulate_block_replication(self.source_table_path, self.dr_table_path)
+        replicated = self._simulate_block_replication(self.source_table_path, self.dr_table_path)
         
         # Scan
-        current_files = scanner.scan_data_files(str(dr_data_path))
+        current_files = scanner.scan_entries(replicated)
         
         # Calculate delta
         delta = calculate_delta(current_files, tracked_files)
@@ -298,7 +381,8 @@ class TestSimpleIntegration(unittest.TestCase):
         state_mgr.save_state(self.db, self.table, delta['new_count'],
                             delta['new_count'] * 100, list(delta['new_files']), True)
         
-        tracked_files = current_files.copy()
+        tracked_files |= delta['new_files']
+        tracked_files -= delta['orphaned_files']
         
         print(f"  ✅ Sync 2 complete: {delta['new_count']} files processed")
         
@@ -317,6 +401,9 @@ class TestSimpleIntegration(unittest.TestCase):
         state_mgr.save_state(self.db, self.table, delta['new_count'],
                             0, [], True)
         
+        self.assertEqual(delta['new_count'], 0)
+        self.assertEqual(tracked_files, current_files)
+        
         print(f"  ✅ Sync 3 complete: No changes detected")
         
         # === FINAL VERIFICATION ===
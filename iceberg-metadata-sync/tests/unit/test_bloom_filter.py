@@ -0,0 +1,94 @@
+"""Unit tests for BloomFilter."""
+import unittest
+from pathlib import Path
+import tempfile
+import shutil
+
+from src.bloom_filter import BloomFilter, ScalableBloomFilter
+
+
+class TestBloomFilter(unittest.TestCase):
+    """Test BloomFilter functionality."""
+    
+    def setUp(self):
+        """Create temporary directory for serialized filters."""
+        self.test_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test directory."""
+        shutil.rmtree(self.test_dir)
+    
+    def test_added_items_are_members(self):
+        """Test that every added item is reported as a member."""
+        bloom = ScalableBloomFilter(initial_capacity=100)
+        files = [f"/data/file{i}.parquet" for i in range(1000)]
+        bloom.update(files)
+        
+        for file_path in files:
+            self.assertIn(file_path, bloom)
+    
+    def test_false_positive_rate(self):
+        """Test that the false positive rate stays low at the rated capacity."""
+        bloom = BloomFilter(capacity=50000, error_rate=0.01)
+        for i in range(50000):
+            bloom.add(f"/data/file{i}.parquet")
+        
+        false_positives = sum(
+            f"/other/file{i}.parquet" in bloom for i in range(10000)
+        )
+        
+        self.assertLess(false_positives / 10000, 0.01)
+    
+    def test_false_positive_rate_after_growth(self):
+        """Test that the false positive rate stays low well past the initial capacity."""
+        bloom = ScalableBloomFilter(initial_capacity=1000, error_rate=0.01)
+        bloom.update(f"/data/file{i}.parquet" for i in range(50000))
+        
+        self.assertGreater(len(bloom.layers), 1)
+        false_positives = sum(
+            f"/other/file{i}.parquet" in bloom for i in range(10000)
+        )
+        
+        self.assertLess(false_positives / 10000, 0.01)
+    
+    def test_duplicates_not_counted(self):
+        """Test that re-adding items doesn't use up capacity."""
+        bloom = ScalableBloomFilter(initial_capacity=100)
+        for _ in range(3):
+            bloom.update(f"/data/file{i}.parquet" for i in range(100))
+        
+        self.assertEqual(len(bloom.layers), 1)
+    
+    def test_round_trip(self):
+        """Test serializing and loading a filter."""
+        bloom = ScalableBloomFilter(initial_capacity=10)
+        bloom.update(f"file{i}.parquet" for i in range(50))
+        
+        path = Path(self.test_dir) / "filter.bloom"
+        path.write_bytes(bloom.to_bytes())
+        
+        loaded = ScalableBloomFilter.load(path)
+        self.assertEqual(len(loaded.layers), len(bloom.layers))
+        self.assertEqual(len(loaded), len(bloom))
+        self.assertIn("file1.parquet", loaded)
+        self.assertNotIn("other.parquet", loaded)
+    
+    def test_load_missing_file(self):
+        """Test loading a filter that hasn't been written yet."""
+        bloom = ScalableBloomFilter.load(Path(self.test_dir) / "missing.bloom")
+        
+        self.assertNotIn("file1.parquet", bloom)
+    
+    def test_load_truncated(self):
+        """Test that truncated filter data is rejected."""
+        bloom = ScalableBloomFilter(initial_capacity=10)
+        bloom.update(f"file{i}.parquet" for i in range(50))
+        
+        with self.assertRaises(ValueError):
+            ScalableBloomFilter.from_bytes(bloom.to_bytes()[:-1])
+        with self.assertRaises(ValueError):
+            ScalableBloomFilter.from_bytes(b"\x00" * 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,41 +1,63 @@
 """Unit tests for FileScanner."""
+import os
+import time
 import unittest
 from pathlib import Path
+from unittest import mock
 import tempfile
 import shutil
 
-from src.file_scanner import FileScanner
+from src.file_scanner import FileScanner, _modified_after
+from tests.helpers import TEST_TMP_DIR
 
 
 class TestFileScanner(unittest.TestCase):
     """Test FileScanner functionality."""
     
-    def setUp(self):
-        """Create temporary test directory with sample files."""
-        self.test_dir = tempfile.mkdtemp()
-        self.test_path = Path(self.test_dir)
+    @classmethod
+    def setUpClass(cls):
+        """
+        Create a temporary test directory with sample files.
         
+        The tree is shared by all tests and must not be modified; tests that
+        change files build their own copy with `_private_tree`.
+        """
+        cls.test_dir = tempfile.mkdtemp(dir=TEST_TMP_DIR)
+        cls.test_path = Path(cls.test_dir)
+        cls.files = cls._create_sample_tree(cls.test_path)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up test directory."""
+        shutil.rmtree(cls.test_dir)
+    
+    @staticmethod
+    def _create_sample_tree(root: Path):
+        """Create sample parquet files (and one other file) under root/data."""
         # Create sample directory structure
-        (self.test_path / "data" / "subdir1").mkdir(parents=True)
-        (self.test_path / "data" / "subdir2").mkdir(parents=True)
+        (root / "data" / "subdir1").mkdir(parents=True)
+        (root / "data" / "subdir2").mkdir(parents=True)
         
         # Create sample parquet files
-        self.files = [
-            self.test_path / "data" / "file1.parquet",
-            self.test_path / "data" / "file2.parquet",
-            self.test_path / "data" / "subdir1" / "file3.parquet",
-            self.test_path / "data" / "subdir2" / "file4.parquet",
+        files = [
+            root / "data" / "file1.parquet",
+            root / "data" / "file2.parquet",
+            root / "data" / "subdir1" / "file3.parquet",
+            root / "data" / "subdir2" / "file4.parquet",
         ]
         
-        for file_path in self.files:
+        for file_path in files:
             file_path.write_text("dummy parquet data")
         
         # Create non-parquet file (should be ignored)
-        (self.test_path / "data" / "readme.txt").write_text("readme")
+        (root / "data" / "readme.txt").write_text("readme")
+        
+        return files
     
-    def tearDown(self):
-        """Clean up test directory."""
-        shutil.rmtree(self.test_dir)
+    def _private_tree(self):
+        """Create a copy of the sample tree that only this test uses."""
+        root = self.test_path / self.id().split('.')[-1]
+        return root, self._create_sample_tree(root)
     
     def test_scan_local_files(self):
         """Test scanning local filesystem."""
@@ -52,6 +74,76 @@ class TestFileScanner(unittest.TestCase):
             self.assertTrue(Path(file_path).is_absolute())
             self.assertTrue(file_path.endswith('.parquet'))
     
+    def test_scan_nested_directories(self):
+        """Test scanning files nested several levels below a top-level directory."""
+        scanner = FileScanner(spark_session=None)
+        root, _ = self._private_tree()
+        
+        nested_dir = root / "data" / "subdir1" / "a=1" / "b=2"
+        nested_dir.mkdir(parents=True)
+        (nested_dir / "file5.parquet").write_text("dummy parquet data")
+        
+        found_files = scanner.scan_data_files(str(root / "data"))
+        
+        self.assertEqual(len(found_files), 5)
+        self.assertIn(str(nested_dir / "file5.parquet"), found_files)
+    
+    def test_scan_files_since(self):
+        """Test scanning only files changed since a point in time."""
+        scanner = FileScanner(spark_session=None)
+        root, files = self._private_tree()
+        
+        old_time = time.time() - 3600
+        for file_path in files[:3]:
+            os.utime(file_path, (old_time, old_time))
+        
+        # ctime can't be set back, so use a bound after the files were created
+        changed_since = time.time() + 1
+        future_time = changed_since + 60
+        os.utime(files[3], (future_time, future_time))
+        
+        found_files = scanner.scan_data_files_since(
+            str(root / "data"), changed_since
+        )
+        
+        self.assertEqual(found_files, {str(files[3])})
+    
+    @unittest.skipUnless(hasattr(time, "tzset"), "needs time.tzset")
+    def test_modified_after_is_utc(self):
+        """Test that the Spark modifiedAfter bound doesn't depend on the local time zone."""
+        previous_tz = os.environ.get("TZ")
+        os.environ["TZ"] = "America/New_York"
+        time.tzset()
+        try:
+            # 1700000000 is 2023-11-14T22:13:20Z
+            self.assertEqual(_modified_after(1700000000.5), "2023-11-14T22:13:19")
+        finally:
+            if previous_tz is None:
+                del os.environ["TZ"]
+            else:
+                os.environ["TZ"] = previous_tz
+            time.tzset()
+    
+    def test_full_scan_does_not_stat_files(self):
+        """Test that file times are only read when scanning for changes."""
+        scanner = FileScanner(spark_session=None)
+        
+        with mock.patch("src.file_scanner._changed_at", side_effect=AssertionError):
+            found_files = scanner.scan_data_files(str(self.test_path / "data"))
+        
+        self.assertEqual(len(found_files), 4)
+    
+    def test_scan_entries(self):
+        """Test collecting data files from a known file list."""
+        scanner = FileScanner(spark_session=None)
+        
+        with os.scandir(self.test_path / "data") as entries:
+            found_files = scanner.scan_entries(list(entries))
+        self.assertEqual(found_files, {str(f) for f in self.files[:2]})
+        
+        found_files = scanner.scan_entries(str(f) for f in self.files)
+        self.assertEqual(found_files, {str(f) for f in self.files})
+    
     def test_scan_empty_directory(self):
         """Test scanning empty directory."""
         scanner = FileScanner(spark_session=None)
@@ -0,0 +1,70 @@
+"""Unit tests for PathSet."""
+import pickle
+import unittest
+
+from src.path_set import PathSet
+
+
+class TestPathSet(unittest.TestCase):
+    """Test PathSet functionality."""
+    
+    def setUp(self):
+        """Create sample path sets."""
+        self.current = PathSet([
+            "/data/a=1/file1.parquet",
+            "/data/a=1/file2.parquet",
+            "/data/a=2/file3.parquet",
+            "file4.parquet",
+        ])
+        self.tracked = PathSet([
+            "/data/a=1/file1.parquet",
+            "/data/a=3/file5.parquet",
+        ])
+    
+    def test_set_semantics(self):
+        """Test membership, length, iteration and equality with plain sets."""
+        self.assertEqual(len(self.current), 4)
+        self.assertIn("/data/a=2/file3.parquet", self.current)
+        self.assertIn("file4.parquet", self.current)
+        self.assertNotIn("/data/a=2/file1.parquet", self.current)
+        self.assertNotIn(None, self.current)
+        
+        self.current.add("/data/a=1/file1.parquet")
+        self.assertEqual(len(self.current), 4)
+        
+        self.assertEqual(self.current, {
+            "/data/a=1/file1.parquet",
+            "/data/a=1/file2.parquet",
+            "/data/a=2/file3.parquet",
+            "file4.parquet",
+        })
+    
+    def test_set_operations(self):
+        """Test operations between path sets and with plain sets."""
+        expected_new = {
+            "/data/a=1/file2.parquet",
+            "/data/a=2/file3.parquet",
+            "file4.parquet",
+        }
+        
+        self.assertEqual(self.current.difference(self.tracked), expected_new)
+        self.assertEqual(self.current - set(self.tracked), expected_new)
+        self.assertEqual(self.tracked - self.current, {"/data/a=3/file5.parquet"})
+        self.assertEqual(self.current & self.tracked, {"/data/a=1/file1.parquet"})
+        self.assertEqual(set(self.tracked) & self.current, {"/data/a=1/file1.parquet"})
+        self.assertEqual(len(self.current | self.tracked), 5)
+        self.assertEqual(len(self.current | {"/data/new.parquet"}), 5)
+        
+        self.assertIsInstance(self.current - self.tracked, PathSet)
+        self.assertEqual(len(self.current), 4, "Operations should not modify operands")
+    
+    def test_pickle_round_trip(self):
+        """Test that path sets survive pickling (e.g. Spark broadcasts)."""
+        restored = pickle.loads(pickle.dumps(self.current))
+        
+        self.assertEqual(restored, self.current)
+        self.assertEqual(len(restored), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
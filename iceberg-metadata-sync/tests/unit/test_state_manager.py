@@ -6,6 +6,7 @@ import shutil
 import json
 
 from src.state_manager import StateManager
+from src.utils import path_signature
 
 
 class TestStateManager(unittest.TestCase):
@@ -124,10 +125,174 @@ class TestStateManager(unittest.TestCase):
         self.assertEqual(stats['failed_runs'], 1)
         self.assertEqual(stats['total_files_processed'], 8)
     
+    def test_history_is_capped(self):
+        """Test that run history and processed files are trimmed on disk."""
+        for i in range(250):
+            self.manager.save_state(
+                "testdb", "testtable", 1, 10,
+                [f"file{i}_{j}.parquet" for j in range(50)], True
+            )
+        
+        state = self.manager.load_state("testdb", "testtable")
+        
+        self.assertEqual(len(state['runs']), 100)
+        self.assertEqual(len(state['processed_files']), 10000)
+        self.assertEqual(state['processed_files'][-1], "file249_49.parquet")
+        self.assertEqual(state['total_files_processed'], 250)
+        
+        runs_file = Path(self.state_dir) / "state_testdb_testtable.runs.ndjson"
+        with open(runs_file) as f:
+            self.assertLess(len(f.readlines()), 200)
+    
+    def test_processed_files_are_deduplicated(self):
+        """Test that reprocessed files are only kept once, at their latest position."""
+        self.manager.save_state("testdb", "testtable", 2, 200,
+                                ["file1.parquet", "file2.parquet"], True)
+        self.manager.save_state("testdb", "testtable", 2, 200,
+                                ["file1.parquet", "file3.parquet", "file3.parquet"], True)
+        
+        state = self.manager.load_state("testdb", "testtable")
+        
+        self.assertEqual(
+            state['processed_files'],
+            ["file2.parquet", "file1.parquet", "file3.parquet"]
+        )
+    
+    def test_is_file_processed(self):
+        """Test membership checks for processed files beyond the retained history."""
+        self.manager.save_state("testdb", "testtable", 2, 200,
+                                ["file1.parquet", "file2.parquet"], True)
+        
+        self.assertTrue(self.manager.is_file_processed("testdb", "testtable", "file1.parquet"))
+        self.assertTrue(self.manager.is_file_processed("testdb", "testtable", "file2.parquet"))
+        self.assertFalse(self.manager.is_file_processed("testdb", "testtable", "file3.parquet"))
+        self.assertFalse(self.manager.is_file_processed("otherdb", "testtable", "file1.parquet"))
+    
+    def test_unreadable_bloom_filter(self):
+        """Test that a truncated Bloom filter doesn't block saving state and is rebuilt."""
+        self.manager.save_state("testdb", "testtable", 1, 100, ["file1.parquet"], True,
+                                scan_time=1000.0)
+        bloom_file = Path(self.state_dir) / "state_testdb_testtable.bloom"
+        bloom_file.write_bytes(bloom_file.read_bytes()[:1000])
+        
+        self.assertTrue(self.manager.is_file_processed("testdb", "testtable", "file1.parquet"))
+        
+        self.manager.save_state("testdb", "testtable", 1, 100, ["file2.parquet"], True,
+                                scan_time=2000.0)
+        
+        self.assertEqual(self.manager.get_last_scan_time("testdb", "testtable"), 2000.0)
+        self.assertTrue(self.manager.is_file_processed("testdb", "testtable", "file1.parquet"))
+        self.assertTrue(self.manager.is_file_processed("testdb", "testtable", "file2.parquet"))
+        self.assertFalse(self.manager.is_file_processed("testdb", "testtable", "file3.parquet"))
+    
+    def test_last_scan_time(self):
+        """Test that only successful runs advance the last scan time."""
+        self.assertIsNone(self.manager.get_last_scan_time("testdb", "testtable"))
+        
+        self.manager.save_state("testdb", "testtable", 1, 100, [], True, scan_time=1000.0)
+        self.manager.save_state("testdb", "testtable", 0, 0, [], False, scan_time=2000.0)
+        
+        self.assertEqual(self.manager.get_last_scan_time("testdb", "testtable"), 1000.0)
+    
+    def test_save_and_load_tracked_files(self):
+        """Test persisting the Iceberg tracked-file set."""
+        snapshot_id, files = self.manager.load_tracked_files("testdb", "testtable")
+        self.assertIsNone(snapshot_id)
+        self.assertEqual(files, set())
+        
+        self.manager.save_tracked_files(
+            "testdb", "testtable", 123, {"file1.parquet", "file2.parquet"}
+        )
+        
+        snapshot_id, files = self.manager.load_tracked_files("testdb", "testtable")
+        self.assertEqual(snapshot_id, 123)
+        self.assertEqual(files, {"file1.parquet", "file2.parquet"})
+    
+    def test_add_tracked_files(self):
+        """Test extending the saved tracked-file set."""
+        self.manager.add_tracked_files("testdb", "testtable", 100, {"file0.parquet"})
+        self.assertEqual(self.manager.load_tracked_files("testdb", "testtable")[0], None)
+        
+        existing = {f"/data/file{i}.parquet" for i in range(1000)}
+        self.manager.save_tracked_files("testdb", "testtable", 123, existing)
+        self.manager.add_tracked_files(
+            "testdb", "testtable", 124, {"/data/new.parquet", "/data/file1.parquet"}
+        )
+        
+        snapshot_id, files = self.manager.load_tracked_files("testdb", "testtable")
+        self.assertEqual(snapshot_id, 124)
+        self.assertEqual(files, existing | {"/data/new.parquet"})
+    
+    def test_tracked_signature(self):
+        """Test that the saved signature follows incremental additions."""
+        self.assertIsNone(self.manager.load_tracked_signature("testdb", "testtable"))
+        
+        existing = {f"/data/file{i}.parquet" for i in range(1000)}
+        self.manager.save_tracked_files("testdb", "testtable", 123, existing)
+        self.assertEqual(
+            self.manager.load_tracked_signature("testdb", "testtable"),
+            (123, 1000, path_signature(existing))
+        )
+        
+        self.manager.add_tracked_files(
+            "testdb", "testtable", 124, {"/data/new.parquet", "/data/file1.parquet"}
+        )
+        expected = existing | {"/data/new.parquet"}
+        self.assertEqual(
+            self.manager.load_tracked_signature("testdb", "testtable"),
+            (124, 1001, path_signature(expected))
+        )
+    
+    def test_tracked_files_other_format_ignored(self):
+        """Test that a tracked-file set in another format is treated as missing."""
+        self.manager.save_tracked_files("testdb", "testtable", 123, {"file1.parquet"})
+        
+        meta_file = Path(self.state_dir) / "state_testdb_testtable.tracked" / "meta.json"
+        meta_file.write_text(json.dumps({'snapshot_id': 123}))
+        
+        snapshot_id, files = self.manager.load_tracked_files("testdb", "testtable")
+        self.assertIsNone(snapshot_id)
+        self.assertEqual(len(files), 0)
+    
+    def test_load_states_batch(self):
+        """Test loading state for several tables at once."""
+        self.manager.save_state("testdb", "table1", 5, 500, ["file1.parquet"], True)
+        self.manager.save_state("testdb", "table2", 3, 300, [], True)
+        
+        states = self.manager.load_states_batch(
+            [("testdb", "table1"), ("testdb", "table2"), ("testdb", "table3")]
+        )
+        
+        self.assertEqual(states[("testdb", "table1")]['total_files_processed'], 5)
+        self.assertEqual(states[("testdb", "table1")]['processed_files'], ["file1.parquet"])
+        self.assertEqual(states[("testdb", "table2")]['total_rows_processed'], 300)
+        self.assertIsNone(states[("testdb", "table3")]['last_run_time'])
+    
+    def test_load_legacy_state(self):
+        """Test that state files with inline history are still readable."""
+        state_file = Path(self.state_dir) / "state_testdb_testtable.json"
+        with open(state_file, 'w') as f:
+            json.dump({
+                'last_run_time': '2024-01-01T00:00:00',
+                'total_files_processed': 1,
+                'total_rows_processed': 100,
+                'runs': [{'timestamp': '2024-01-01T00:00:00', 'files_processed': 1,
+                          'rows_processed': 100, 'success': True}],
+                'processed_files': ["file1.parquet"]
+            }, f)
+        
+        self.manager.save_state("testdb", "testtable", 1, 100, ["file2.parquet"], True)
+        state = self.manager.load_state("testdb", "testtable")
+        
+        self.assertEqual(len(state['runs']), 2)
+        self.assertEqual(state['processed_files'], ["file1.parquet", "file2.parquet"])
+        self.assertEqual(state['total_files_processed'], 2)
+    
     def test_clear_state(self):
         """Test clearing state."""
         # Save state
         self.manager.save_state("testdb", "testtable", 5, 500, [], True)
+        self.manager.save_tracked_files("testdb", "testtable", 123, {"file1.parquet"})
         
         # Verify it exists
         state_file = Path(self.state_dir) / "state_testdb_testtable.json"
@@ -138,6 +303,7 @@ class TestStateManager(unittest.TestCase):
         
         # Verify it's gone
         self.assertFalse(state_file.exists())
+        self.assertEqual(list(Path(self.state_dir).iterdir()), [])
 
 
 if __name__ == '__main__':
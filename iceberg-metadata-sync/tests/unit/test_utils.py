@@ -1,7 +1,7 @@
 """Unit tests for utility functions."""
 import unittest
 
-from src.utils import calculate_delta, format_bytes
+from src.utils import calculate_delta, format_bytes, path_signature
 
 
 class TestUtils(unittest.TestCase):
@@ -29,6 +29,18 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(delta['orphaned_count'], 0)
         self.assertEqual(delta['common_count'], 3)
     
+    def test_path_signature(self):
+        """Test that the path signature ignores order but not content."""
+        paths = [f"/data/file{i}.parquet" for i in range(100)]
+        
+        self.assertEqual(path_signature(paths), path_signature(reversed(paths)))
+        self.assertNotEqual(path_signature(paths), path_signature(paths[1:]))
+        self.assertEqual(
+            path_signature(paths),
+            path_signature(paths[:50]) ^ path_signature(paths[50:])
+        )
+        self.assertEqual(path_signature([]), 0)
+    
     def test_calculate_delta_mixed(self):
         """Test delta calculation with mix of new, common, and orphaned."""
         current = {"file1", "file2", "file3", "file4"}
@@ -43,6 +55,30 @@ class TestUtils(unittest.TestCase):
         self.assertIn("file1", delta['new_files'])
         self.assertIn("file4", delta['new_files'])
         self.assertIn("file5", delta['orphaned_files'])
+        self.assertNotIn('common_files', delta)
+    
+    def test_calculate_delta_counts_only(self):
+        """Test that counts match when the file sets are left out."""
+        current = {"file1", "file2", "file3", "file4"}
+        tracked = {"file2", "file3", "file5"}
+        
+        delta = calculate_delta(current, tracked, include_files=False)
+        
+        self.assertEqual(delta['new_count'], 2)
+        self.assertEqual(delta['orphaned_count'], 1)
+        self.assertEqual(delta['common_count'], 2)
+        self.assertNotIn('new_files', delta)
+        self.assertNotIn('orphaned_files', delta)
+    
+    def test_calculate_delta_compute_common(self):
+        """Test that common files are only built when requested."""
+        current = frozenset({"file1", "file2", "file3"})
+        tracked = frozenset({"file2", "file3", "file4"})
+        
+        delta = calculate_delta(current, tracked, compute_common=True)
+        
+        self.assertEqual(delta['common_files'], {"file2", "file3"})
+        self.assertEqual(delta['common_count'], 2)
     
     def test_format_bytes(self):
         """Test byte formatting."""
@@ -4,37 +4,85 @@ Deploy Text-to-SQL Agent to Cloudera AI Inference Service
 This script automates deployment to the next-generation CAI platform.
 """
 
+import importlib.util
 import os
 import sys
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import List, Optional, Union
 from loguru import logger
 
+# libyaml bindings parse and emit several times faster than the pure-Python
+# implementation; they are missing when PyYAML was built without libyaml
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+# The Kubernetes client is optional; kubectl is used when it is missing.
+# It is only imported when used, since it loads its whole generated API
+KUBERNETES_AVAILABLE = importlib.util.find_spec("kubernetes") is not None
+
+# InferenceService custom resource coordinates
+INFERENCE_GROUP = "inference.cloudera.com"
+INFERENCE_VERSION = "v1"
+INFERENCE_PLURAL = "inferenceservices"
+
+# How long to wait for deployed services to become ready
+READY_TIMEOUT_SECONDS = 300
+
+# Environment variables the deployed model needs
+REQUIRED_ENV_VARS = frozenset({
+    "OPENAI_API_KEY",
+    "HIVE_HOST",
+    "HIVE_USER",
+    "HIVE_PASSWORD"
+})
+
+# Separator line for the deployment log
+BANNER = "=" * 60
+
+# Parsed configs keyed by absolute path, with the mtime they were read at
+_CONFIG_CACHE = {}
+
+# Custom objects API client, created on first use
+_CUSTOM_OBJECTS_API = None
+
+# Service URLs seen while waiting for deployments, keyed by (namespace, name)
+_SERVICE_URLS = {}
+
 
 def load_deployment_config(config_path: str = "cloudera/ai_inference_config.yaml") -> dict:
-    """Load deployment configuration."""
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    """
+    Load deployment configuration.
+    
+    The parsed config is cached until the file's modification time changes,
+    so repeated loads don't re-read and re-parse it.
+    """
+    path = os.path.abspath(config_path)
+    mtime = os.stat(path).st_mtime_ns
+    
+    cached = _CONFIG_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    with open(path, 'r') as f:
+        config = yaml.load(f, Loader=SafeLoader)
+    _CONFIG_CACHE[path] = (mtime, config)
     return config
 
 
 def validate_environment():
     """Validate required environment variables are set."""
-    required_vars = [
-        "OPENAI_API_KEY",
-        "HIVE_HOST",
-        "HIVE_USER",
-        "HIVE_PASSWORD"
-    ]
+    missing = REQUIRED_ENV_VARS - os.environ.keys()
     
-    missing = []
-    for var in required_vars:
-        if not os.environ.get(var):
-            missing.append(var)
+    # Variables that are set but empty count as missing too
+    missing |= {var for var in REQUIRED_ENV_VARS - missing if not os.environ[var]}
     
     if missing:
         raise ValueError(
-            f"Missing required environment variables: {', '.join(missing)}\n"
+            f"Missing required environment variables: {', '.join(sorted(missing))}\n"
             "Set them before deployment."
         )
     
@@ -48,15 +96,39 @@ def create_deployment_manifest(config: dict, output_path: str):
     Args:
         config: Deployment configuration
         output_path: Path to write manifest
+    
+    Returns:
+        The manifest, to pass on to deploy_to_cai so it isn't read back
     """
+    model = config["model"]
+    model_name = model["name"]
+    cpu = config["resources"]["cpu"]
+    memory = config["resources"]["memory"]
+    scaling = config["scaling"]
+    
+    # Mounts and claims are built in one pass over the configured volumes
+    volume_mounts = []
+    volumes = []
+    for vol in config["volumes"]:
+        volume_mounts.append({
+            "name": vol["name"],
+            "mountPath": vol["path"]
+        })
+        volumes.append({
+            "name": vol["name"],
+            "persistentVolumeClaim": {
+                "claimName": f"{model_name}-{vol['name']}"
+            }
+        })
+    
     manifest = {
         "apiVersion": "inference.cloudera.com/v1",
         "kind": "InferenceService",
         "metadata": {
-            "name": config["model"]["name"],
+            "name": model_name,
             "labels": {
                 "app": "text-to-sql-agent",
-                "version": config["model"]["version"]
+                "version": model["version"]
             }
         },
         "spec": {
@@ -71,113 +143,219 @@ def create_deployment_manifest(config: dict, output_path: str):
                         ],
                         "resources": {
                             "requests": {
-                                "cpu": f"{config['resources']['cpu']['default']}",
-                                "memory": f"{config['resources']['memory']['default']}Gi"
+                                "cpu": str(cpu["default"]),
+                                "memory": f"{memory['default']}Gi"
                             },
                             "limits": {
-                                "cpu": f"{config['resources']['cpu']['max']}",
-                                "memory": f"{config['resources']['memory']['max']}Gi"
+                                "cpu": str(cpu["max"]),
+                                "memory": f"{memory['max']}Gi"
                             }
                         },
-                        "volumeMounts": [
-                            {
-                                "name": vol["name"],
-                                "mountPath": vol["path"]
-                            }
-                            for vol in config["volumes"]
-                        ]
+                        "volumeMounts": volume_mounts
                     }
                 }
             },
             "scaling": {
-                "minReplicas": config["scaling"]["min_replicas"],
-                "maxReplicas": config["scaling"]["max_replicas"],
+                "minReplicas": scaling["min_replicas"],
+                "maxReplicas": scaling["max_replicas"],
                 "metrics": [
                     {
                         "type": "Resource",
                         "resource": {
                             "name": "cpu",
-                            "targetAverageUtilization": config["scaling"]["target_cpu_utilization"]
+                            "targetAverageUtilization": scaling["target_cpu_utilization"]
                         }
                     },
                     {
                         "type": "Resource",
                         "resource": {
                             "name": "memory",
-                            "targetAverageUtilization": config["scaling"]["target_memory_utilization"]
+                            "targetAverageUtilization": scaling["target_memory_utilization"]
                         }
                     }
                 ]
             },
-            "volumes": [
-                {
-                    "name": vol["name"],
-                    "persistentVolumeClaim": {
-                        "claimName": f"{config['model']['name']}-{vol['name']}"
-                    }
-                }
-                for vol in config["volumes"]
-            ]
+            "volumes": volumes
         }
     }
     
-    # Write manifest
+    # Write manifest; keys stay in the order built above, which is the
+    # conventional Kubernetes order, and long values are not wrapped
     with open(output_path, 'w') as f:
-        yaml.dump(manifest, f, default_flow_style=False)
+        yaml.dump(
+            manifest, f, Dumper=SafeDumper,
+            default_flow_style=False, sort_keys=False, width=4096
+        )
     
     logger.info(f"✓ Deployment manifest created: {output_path}")
     return manifest
 
 
+def _custom_objects_api():
+    """Kubernetes custom objects API client, created once per process."""
+    global _CUSTOM_OBJECTS_API
+    if _CUSTOM_OBJECTS_API is None:
+        from kubernetes import client as k8s_client, config as k8s_config
+        
+        try:
+            k8s_config.load_incluster_config()
+        except k8s_config.ConfigException:
+            k8s_config.load_kube_config()
+        _CUSTOM_OBJECTS_API = k8s_client.CustomObjectsApi()
+    return _CUSTOM_OBJECTS_API
+
+
+def _is_ready(inference_service: dict) -> bool:
+    """Check whether an InferenceService reports condition Ready=True."""
+    conditions = inference_service.get("status", {}).get("conditions", [])
+    return any(
+        condition.get("type") == "Ready" and condition.get("status") == "True"
+        for condition in conditions
+    )
+
+
 def deploy_to_cai(
-    manifest_path: str,
-    namespace: str = "default"
+    manifest_paths: Union[str, List[str]],
+    namespace: str = "default",
+    manifests: Optional[List[dict]] = None
 ):
     """
-    Deploy model to Cloudera AI Inference.
+    Deploy models to Cloudera AI Inference.
+    
+    With the `kubernetes` package installed, the manifests are applied and
+    awaited through one API client connection. Otherwise all manifests are
+    applied by one `kubectl apply` and awaited by one `kubectl wait`.
     
     Args:
-        manifest_path: Path to deployment manifest
+        manifest_paths: Path to a deployment manifest, or a list of paths
         namespace: Kubernetes namespace
+        manifests: Already parsed manifests, in the same order as
+            `manifest_paths`; read from the files if not given
     """
-    import subprocess
+    if isinstance(manifest_paths, str):
+        manifest_paths = [manifest_paths]
+    
+    if manifests is None:
+        manifests = []
+        for manifest_path in manifest_paths:
+            with open(manifest_path, 'r') as f:
+                manifests.append(yaml.load(f, Loader=SafeLoader))
     
     logger.info("Deploying to Cloudera AI Inference...")
     
-    # Apply manifest using kubectl
-    cmd = [
-        "kubectl", "apply",
-        "-f", manifest_path,
-        "-n", namespace
-    ]
+    model_names = [manifest["metadata"]["name"] for manifest in manifests]
+    
+    if KUBERNETES_AVAILABLE:
+        _apply_with_client(manifests, namespace)
+    else:
+        _apply_with_kubectl(manifest_paths, namespace)
+    
+    logger.info(f"✓ Deployment successful")
+    
+    # Wait for deployments to be ready
+    logger.info("Waiting for deployment to be ready...")
+    
+    if KUBERNETES_AVAILABLE:
+        ready = _wait_with_client(model_names, namespace)
+    else:
+        ready = _wait_with_kubectl(model_names, namespace)
+    
+    if ready:
+        logger.info("✓ Deployment is ready")
+
+
+def _apply_with_client(manifests: List[dict], namespace: str):
+    """Create each InferenceService, or patch it if it already exists."""
+    from kubernetes import client as k8s_client
+    
+    api = _custom_objects_api()
+    
+    for manifest in manifests:
+        name = manifest["metadata"]["name"]
+        try:
+            api.create_namespaced_custom_object(
+                INFERENCE_GROUP, INFERENCE_VERSION, namespace, INFERENCE_PLURAL, manifest
+            )
+            logger.info(f"inferenceservice/{name} created")
+        except k8s_client.ApiException as e:
+            if e.status != 409:
+                raise RuntimeError(f"Deployment failed: {e.reason}") from e
+            api.patch_namespaced_custom_object(
+                INFERENCE_GROUP, INFERENCE_VERSION, namespace, INFERENCE_PLURAL, name, manifest
+            )
+            logger.info(f"inferenceservice/{name} configured")
+
+
+def _wait_with_client(model_names: List[str], namespace: str) -> bool:
+    """Watch the InferenceServices until all are Ready or the timeout passes."""
+    from kubernetes import watch as k8s_watch
+    
+    pending = set(model_names)
+    
+    # The watch starts with an event for every existing object, so services
+    # that were already ready are seen without a separate get
+    watcher = k8s_watch.Watch()
+    for event in watcher.stream(
+        _custom_objects_api().list_namespaced_custom_object,
+        INFERENCE_GROUP, INFERENCE_VERSION, namespace, INFERENCE_PLURAL,
+        timeout_seconds=READY_TIMEOUT_SECONDS
+    ):
+        inference_service = event["object"]
+        if _is_ready(inference_service):
+            name = inference_service["metadata"]["name"]
+            pending.discard(name)
+            url = inference_service.get("status", {}).get("url")
+            if url:
+                _SERVICE_URLS[(namespace, name)] = url
+        if not pending:
+            watcher.stop()
+            return True
+    
+    logger.warning(f"Deployment may not be ready: {', '.join(sorted(pending))}")
+    return False
+
+
+def _apply_with_kubectl(manifest_paths: List[str], namespace: str):
+    """Apply all manifests with a single kubectl invocation."""
+    import subprocess
+    
+    cmd = ["kubectl", "apply"]
+    for manifest_path in manifest_paths:
+        cmd += ["-f", manifest_path]
+    cmd += ["-n", namespace]
     
     result = subprocess.run(cmd, capture_output=True, text=True)
     
     if result.returncode != 0:
         raise RuntimeError(f"Deployment failed: {result.stderr}")
     
-    logger.info(f"✓ Deployment successful")
     logger.info(result.stdout)
+
+
+def _wait_with_kubectl(model_names: List[str], namespace: str) -> bool:
+    """Wait for all InferenceServices with a single kubectl invocation."""
+    import subprocess
     
-    # Wait for deployment to be ready
-    logger.info("Waiting for deployment to be ready...")
-    
-    model_name = yaml.safe_load(open(manifest_path))["metadata"]["name"]
-    
-    cmd = [
-        "kubectl", "wait",
-        "--for=condition=Ready",
-        f"inferenceservice/{model_name}",
-        "-n", namespace,
-        "--timeout=300s"
+    # Each ready service is printed with its URL, so get_service_url
+    # doesn't need another kubectl call
+    cmd = ["kubectl", "wait", "--for=condition=Ready"]
+    cmd += [f"inferenceservice/{model_name}" for model_name in model_names]
+    cmd += [
+        "-n", namespace, f"--timeout={READY_TIMEOUT_SECONDS}s",
+        "-o", r'jsonpath={.metadata.name}{"\t"}{.status.url}{"\n"}'
     ]
     
     result = subprocess.run(cmd, capture_output=True, text=True)
     
+    for line in result.stdout.splitlines():
+        name, _, url = line.partition("\t")
+        if url:
+            _SERVICE_URLS[(namespace, name)] = url
+    
     if result.returncode != 0:
         logger.warning(f"Deployment may not be ready: {result.stderr}")
-    else:
-        logger.info("✓ Deployment is ready")
+        return False
+    return True
 
 
 def get_service_url(model_name: str, namespace: str = "default") -> str:
@@ -191,6 +369,21 @@ def get_service_url(model_name: str, namespace: str = "default") -> str:
     Returns:
         Service URL
     """
+    url = _SERVICE_URLS.get((namespace, model_name))
+    if url:
+        return url
+    
+    if KUBERNETES_AVAILABLE:
+        from kubernetes import client as k8s_client
+        
+        try:
+            inference_service = _custom_objects_api().get_namespaced_custom_object(
+                INFERENCE_GROUP, INFERENCE_VERSION, namespace, INFERENCE_PLURAL, model_name
+            )
+        except k8s_client.ApiException as e:
+            raise RuntimeError(f"Failed to get service URL: {e.reason}") from e
+        return inference_service.get("status", {}).get("url", "")
+    
     import subprocess
     
     cmd = [
@@ -234,10 +427,19 @@ def main():
     
     args = parser.parse_args()
     
+    executor = ThreadPoolExecutor(max_workers=1)
+    
     try:
-        logger.info("=" * 60)
+        logger.info(BANNER)
         logger.info("Text-to-SQL Agent - CAI Deployment")
-        logger.info("=" * 60)
+        logger.info(BANNER)
+        
+        # Connecting to the cluster (reading the kubeconfig and running any
+        # credential plugin it names) doesn't depend on the config, so it
+        # runs while the manifest is prepared
+        client_future = None
+        if KUBERNETES_AVAILABLE and not args.manifest_only:
+            client_future = executor.submit(_custom_objects_api)
         
         # Validate environment
         validate_environment()
@@ -248,26 +450,29 @@ def main():
         
         # Create manifest
         manifest_path = "cloudera/deployment_manifest.yaml"
-        create_deployment_manifest(config, manifest_path)
+        manifest = create_deployment_manifest(config, manifest_path)
         
         if args.manifest_only:
             logger.info("Manifest-only mode: skipping deployment")
             logger.info(f"Manifest saved to: {manifest_path}")
             return
         
+        if client_future is not None:
+            client_future.result()
+        
         # Deploy
-        deploy_to_cai(manifest_path, args.namespace)
+        deploy_to_cai(manifest_path, args.namespace, [manifest])
         
         # Get service URL
-        model_name = config["model"]["name"]
+        model_name = manifest["metadata"]["name"]
         service_url = get_service_url(model_name, args.namespace)
         
-        logger.info("=" * 60)
+        logger.info(BANNER)
         logger.info("✓ Deployment Complete!")
-        logger.info("=" * 60)
+        logger.info(BANNER)
         logger.info(f"Model Name: {model_name}")
         logger.info(f"Service URL: {service_url}")
-        logger.info("=" * 60)
+        logger.info(BANNER)
         
         print("\nNext steps:")
         print("  1. Test your deployment:")
@@ -281,6 +486,8 @@ def main():
     except Exception as e:
         logger.error(f"Deployment failed: {e}")
         sys.exit(1)
+    finally:
+        executor.shutdown(wait=False)
 
 
 if __name__ == "__main__":
@@ -15,6 +15,7 @@ CAI provides:
 import os
 import sys
 import json
+import threading
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Union
 
@@ -26,6 +27,15 @@ from src.agent.agent import TextToSQLAgent, ResponseType
 from src.agent.feedback import FeedbackType
 from src.utils.config import load_config
 
+# Inputs the feedback endpoint cannot do without
+FEEDBACK_REQUIRED_INPUTS = ("question", "sql_query", "answer", "feedback_type")
+
+# Feedback types by value, so parsing a request is one dict lookup
+FEEDBACK_TYPES = {feedback_type.value: feedback_type for feedback_type in FeedbackType}
+
+# Response type of failed agent results, resolved once rather than per request
+ERROR_RESPONSE_TYPE = ResponseType.ERROR.value
+
 
 class TextToSQLInferenceModel:
     """
@@ -44,6 +54,11 @@ class TextToSQLInferenceModel:
         self.config = None
         self.version = "1.0.0"
         self.model_name = "text-to-sql-agent"
+        
+        # Responses that don't change once the model is loaded, built once
+        # since health is polled by liveness and readiness probes
+        self._health_response: Optional[Dict[str, Any]] = None
+        self._metadata_response: Optional[Dict[str, Any]] = None
     
     def load(self, model_path: str = None):
         """
@@ -63,6 +78,20 @@ class TextToSQLInferenceModel:
             # Initialize agent
             self.agent = TextToSQLAgent(self.config)
             
+            # Pay the embedding model's first-call setup now rather than on
+            # the first request
+            try:
+                self.agent.vector_store.warm_up()
+            except Exception as e:
+                logger.warning(f"Warm-up failed: {e}")
+            
+            self._health_response = {
+                "status": "healthy",
+                "model_name": self.model_name,
+                "version": self.version,
+                "agent_initialized": True
+            }
+            
             logger.info("Model loaded successfully")
             
         except Exception as e:
@@ -99,68 +128,127 @@ class TextToSQLInferenceModel:
             raise RuntimeError("Model not loaded. Call load() first.")
         
         try:
-            # Extract inputs
-            inputs = request.get("inputs", {})
-            
-            question = inputs.get("question")
-            session_id = inputs.get("session_id")
-            visualization_type = inputs.get("visualization_type")
-            skip_similar_check = inputs.get("skip_similar_check", False)
-            
-            # Validate required inputs
-            if not question:
-                return {
-                    "outputs": {
-                        "success": False,
-                        "error": "Missing required input: question",
-                        "error_type": "validation_error"
-                    }
-                }
-            
-            logger.info(f"Processing question: {question[:100]}...")
+            kwargs, error = self._parse_predict_inputs(request)
+            if error is not None:
+                return error
             
-            # Process question
-            result = self.agent.process_question(
-                question=question,
-                session_id=session_id,
-                visualization_type=visualization_type,
-                skip_similar_check=skip_similar_check
+            logger.opt(lazy=True).info(
+                "Processing question: {}...", lambda: kwargs['question'][:100]
             )
             
-            # Add success flag
-            result["success"] = result.get("response_type") != ResponseType.ERROR.value
+            # Process question
+            result = self.agent.process_question(**kwargs)
             
-            # Wrap in outputs
-            return {"outputs": result}
+            return self._wrap_result(result)
             
         except Exception as e:
-            logger.error(f"Inference failed: {e}", exc_info=True)
-            return {
-                "outputs": {
-                    "success": False,
-                    "error": str(e),
-                    "error_type": "processing_error"
-                }
-            }
+            return self._processing_error(e)
     
     def batch_predict(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Batch inference endpoint.
         
+        Valid requests are handed to the agent as one batch, so work shared
+        across questions (embedding them) is done once; invalid ones get
+        their validation error in place.
+        
         Args:
             requests: List of inference requests
         
         Returns:
             List of inference responses
         """
-        results = []
+        if self.agent is None:
+            raise RuntimeError("Model not loaded. Call load() first.")
         
-        for request in requests:
-            result = self.predict(request)
-            results.append(result)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        batch = []
+        positions = []
+        
+        for i, request in enumerate(requests):
+            try:
+                kwargs, error = self._parse_predict_inputs(request)
+            except Exception as e:
+                results[i] = self._processing_error(e)
+                continue
+            if error is not None:
+                results[i] = error
+            else:
+                batch.append(kwargs)
+                positions.append(i)
+        
+        if batch:
+            logger.info(f"Processing batch of {len(batch)} questions")
+            try:
+                processed = self.agent.process_questions(batch)
+            except Exception as e:
+                error = self._processing_error(e)
+                processed = None
+            
+            for j, i in enumerate(positions):
+                results[i] = error if processed is None else self._wrap_result(processed[j])
         
         return results
     
+    @staticmethod
+    def _parse_predict_inputs(request: Dict[str, Any]):
+        """
+        Extract process_question arguments from an inference request.
+        
+        Returns:
+            Tuple of (keyword arguments, None), or (None, error response)
+        """
+        inputs = request.get("inputs", {})
+        
+        question = inputs.get("question")
+        
+        # Validate required inputs
+        if not question:
+            return None, {
+                "outputs": {
+                    "success": False,
+                    "error": "Missing required input: question",
+                    "error_type": "validation_error"
+                }
+            }
+        
+        if not isinstance(question, str):
+            return None, {
+                "outputs": {
+                    "success": False,
+                    "error": "Input question must be a string",
+                    "error_type": "validation_error"
+                }
+            }
+        
+        return {
+            "question": question,
+            "session_id": inputs.get("session_id"),
+            "visualization_type": inputs.get("visualization_type"),
+            "skip_similar_check": inputs.get("skip_similar_check", False)
+        }, None
+    
+    @staticmethod
+    def _wrap_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Wrap an agent result as an inference response."""
+        # Add success flag
+        result["success"] = result.get("response_type") != ERROR_RESPONSE_TYPE
+        
+        # Wrap in outputs
+        return {"outputs": result}
+    
+    @staticmethod
+    def _processing_error(e: Exception) -> Dict[str, Any]:
+        """Inference response for an unexpected failure."""
+        logger.error("Inference failed: {}", e)
+        return {
+            "outputs": {
+                "success": False,
+                "error": str(e),
+                "error_type": "processing_error"
+            }
+        }
+    
     def feedback(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """
         Feedback endpoint.
@@ -197,18 +285,18 @@ class TextToSQLInferenceModel:
             llm_confidence = inputs.get("llm_confidence")
             
             # Validate required inputs
-            if not all([question, sql_query, answer, feedback_type_str]):
+            missing = [name for name in FEEDBACK_REQUIRED_INPUTS if not inputs.get(name)]
+            if missing:
                 return {
                     "outputs": {
                         "success": False,
-                        "error": "Missing required inputs"
+                        "error": f"Missing required inputs: {', '.join(missing)}"
                     }
                 }
             
             # Parse feedback type
-            try:
-                feedback_type = FeedbackType(feedback_type_str.lower())
-            except ValueError:
+            feedback_type = FEEDBACK_TYPES.get(str(feedback_type_str).lower())
+            if feedback_type is None:
                 return {
                     "outputs": {
                         "success": False,
@@ -248,15 +336,16 @@ class TextToSQLInferenceModel:
         Health check endpoint.
         
         Returns:
-            Health status
+            Health status (shared between calls; do not modify)
         """
-        status = "healthy" if self.agent is not None else "uninitialized"
+        if self._health_response is not None:
+            return self._health_response
         
         return {
-            "status": status,
+            "status": "uninitialized",
             "model_name": self.model_name,
             "version": self.version,
-            "agent_initialized": self.agent is not None
+            "agent_initialized": False
         }
     
     def metadata(self) -> Dict[str, Any]:
@@ -268,8 +357,13 @@ class TextToSQLInferenceModel:
             - Model name and version
             - Input/output schema
             - Supported operations
+            
+            The dict is shared between calls; do not modify it.
         """
-        return {
+        if self._metadata_response is not None:
+            return self._metadata_response
+        
+        self._metadata_response = {
             "model_name": self.model_name,
             "version": self.version,
             "description": "Text-to-SQL Agent for natural language query generation",
@@ -321,29 +415,49 @@ class TextToSQLInferenceModel:
                 "metadata"
             ]
         }
+        return self._metadata_response
 
 
 # Global model instance
 _model = None
+_model_lock = threading.Lock()
 
 
 def get_model() -> TextToSQLInferenceModel:
     """
     Get or create the global model instance.
     
+    Once created, the instance is returned without taking the lock; the
+    lock only keeps concurrent first requests from loading it twice.
+    
     Returns:
         Model instance
     """
     global _model
     
-    if _model is None:
-        _model = TextToSQLInferenceModel()
-        _model.load()
+    model = _model
+    if model is None:
+        with _model_lock:
+            if _model is None:
+                model = TextToSQLInferenceModel()
+                model.load()
+                _model = model
+            model = _model
     
-    return _model
+    return model
 
 
 # CAI entry points
+def load(model_path: str = None) -> None:
+    """
+    CAI load hook.
+    
+    Loads the model up front, so the first request doesn't pay for it;
+    the other entry points load it on first use if this wasn't called.
+    """
+    get_model()
+
+
 def predict(request: Dict[str, Any]) -> Dict[str, Any]:
     """CAI predict endpoint."""
     model = get_model()
@@ -10,10 +10,14 @@ import sys
 import time
 from pathlib import Path
 
-import cmlapi
-from cmlapi.rest import ApiException
 from loguru import logger
 
+# Status polls start fast and back off, since builds and deployments often
+# change state within seconds but can take minutes to finish
+POLL_INITIAL_INTERVAL = 0.25
+POLL_BACKOFF_FACTOR = 1.5
+POLL_MAX_INTERVAL = 10.0
+
 
 def get_cml_client():
     """
@@ -23,6 +27,8 @@ def get_cml_client():
         - CML_API_KEY: Your CML API key
         - CML_HOST: CML workspace host (e.g., ml-xxxxx.cml.company.com)
     """
+    import cmlapi
+    
     api_key = os.environ.get("CML_API_KEY")
     host = os.environ.get("CML_HOST")
     
@@ -41,6 +47,55 @@ def get_cml_client():
     return client
 
 
+def _poll(
+    fetch,
+    done_states,
+    max_wait: float,
+    initial: float = POLL_INITIAL_INTERVAL,
+    factor: float = POLL_BACKOFF_FACTOR,
+    cap: float = POLL_MAX_INTERVAL
+):
+    """
+    Poll an object until its status reaches one of `done_states`.
+    
+    The interval grows by `factor` up to `cap`, and drops back to `initial`
+    whenever the status changes, since one transition is usually followed
+    by another soon after.
+    
+    Args:
+        fetch: Callable returning the current object, which has a `status`
+        done_states: Statuses that end polling
+        max_wait: Maximum seconds to poll
+        initial: First poll interval in seconds
+        factor: Interval growth per unchanged poll
+        cap: Maximum poll interval in seconds
+    
+    Returns:
+        Last fetched object, or None if `max_wait` passed first
+    """
+    deadline = time.time() + max_wait
+    interval = initial
+    last_status = None
+    
+    while True:
+        obj = fetch()
+        
+        if obj.status in done_states:
+            return obj
+        
+        if obj.status != last_status:
+            logger.debug(f"Status: {obj.status}")
+            last_status = obj.status
+            interval = initial
+        
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return None
+        
+        time.sleep(min(interval, remaining))
+        interval = min(interval * factor, cap)
+
+
 def create_model(client, project_id: str, model_name: str = "text-to-sql-agent"):
     """
     Create a new model in CML.
@@ -53,6 +108,9 @@ def create_model(client, project_id: str, model_name: str = "text-to-sql-agent")
     Returns:
         Created model object
     """
+    import cmlapi
+    from cmlapi.rest import ApiException
+    
     logger.info(f"Creating model: {model_name}")
     
     try:
@@ -96,6 +154,9 @@ def create_model_build(
     Returns:
         Model build object
     """
+    import cmlapi
+    from cmlapi.rest import ApiException
+    
     logger.info("Creating model build...")
     
     try:
@@ -120,22 +181,20 @@ def create_model_build(
         # Wait for build to complete
         logger.info("Waiting for build to complete...")
         max_wait = 600  # 10 minutes
-        start_time = time.time()
+        build_id = build.id
         
-        while True:
-            build = client.get_model_build(
+        build = _poll(
+            lambda: client.get_model_build(
                 project_id=project_id,
                 model_id=model_id,
-                build_id=build.id
-            )
-            
-            if build.status in ["built", "failed"]:
-                break
-            
-            if time.time() - start_time > max_wait:
-                raise TimeoutError("Build timed out after 10 minutes")
-            
-            time.sleep(10)
+                build_id=build_id
+            ),
+            ("built", "failed"),
+            max_wait
+        )
+        
+        if build is None:
+            raise TimeoutError("Build timed out after 10 minutes")
         
         if build.status == "failed":
             raise RuntimeError(f"Build failed: {build.built_at}")
@@ -172,6 +231,9 @@ def create_model_deployment(
     Returns:
         Model deployment object
     """
+    import cmlapi
+    from cmlapi.rest import ApiException
+    
     logger.info("Creating model deployment...")
     
     try:
@@ -196,23 +258,21 @@ def create_model_deployment(
         # Wait for deployment to be ready
         logger.info("Waiting for deployment to be ready...")
         max_wait = 300  # 5 minutes
-        start_time = time.time()
+        deployment_id = deployment.id
         
-        while True:
-            deployment = client.get_model_deployment(
+        deployment = _poll(
+            lambda: client.get_model_deployment(
                 project_id=project_id,
                 model_id=model_id,
                 build_id=build_id,
-                deployment_id=deployment.id
-            )
-            
-            if deployment.status in ["deployed", "failed"]:
-                break
-            
-            if time.time() - start_time > max_wait:
-                raise TimeoutError("Deployment timed out after 5 minutes")
-            
-            time.sleep(10)
+                deployment_id=deployment_id
+            ),
+            ("deployed", "failed"),
+            max_wait
+        )
+        
+        if deployment is None:
+            raise TimeoutError("Deployment timed out after 5 minutes")
         
         if deployment.status == "failed":
             raise RuntimeError("Deployment failed")
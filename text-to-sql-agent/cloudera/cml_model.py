@@ -6,11 +6,14 @@ as a CML Model. It provides prediction endpoints compatible with CML's
 model serving infrastructure.
 """
 
+import copy
 import os
 import sys
 import json
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -23,6 +26,61 @@ from src.utils.config import load_config
 
 # Global agent instance
 _agent: Optional[TextToSQLAgent] = None
+_agent_lock = threading.Lock()
+
+# Response returned when a prediction arrives before initialize_model()
+_NOT_INITIALIZED_ERROR = {
+    "success": False,
+    "error": "Agent not initialized. Call initialize_model() first.",
+    "error_type": "initialization_error"
+}
+
+# Feedback types by value, so parsing a request is one dict lookup
+FEEDBACK_TYPES = {feedback_type.value: feedback_type for feedback_type in FeedbackType}
+
+# How long a session-less question's result is reused for the same question
+RESULT_CACHE_TTL_SECONDS = 300
+
+# Number of question results kept for reuse
+RESULT_CACHE_SIZE = 1024
+
+
+class _ResultCache:
+    """Bounded map of request key to result that expires entries after a TTL."""
+    
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        entry = self._items.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            with self._lock:
+                if self._items.get(key) is entry:
+                    del self._items[key]
+            return None
+        return result
+    
+    def put(self, key: Tuple, result: Dict[str, Any]):
+        with self._lock:
+            self._items.pop(key, None)
+            while len(self._items) >= self.max_size:
+                del self._items[next(iter(self._items))]
+            self._items[key] = (time.monotonic() + self.ttl, result)
+    
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._items)
+            self._items.clear()
+        return count
+
+
+_result_cache = _ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL_SECONDS)
 
 
 def initialize_model():
@@ -31,25 +89,41 @@ def initialize_model():
     
     This function is called once when the model is loaded.
     CML will call this automatically during model deployment.
+    
+    Calling it again once the agent exists is a no-op, so a re-initialization
+    doesn't load the configuration and build the agent again; the lock keeps
+    concurrent first calls from each building their own.
     """
     global _agent
     
-    try:
-        logger.info("Initializing Text-to-SQL Agent for CML Model")
-        
-        # Load configuration
-        config = load_config()
-        
-        # Initialize agent
-        _agent = TextToSQLAgent(config)
-        
-        logger.info("Agent initialized successfully")
-        
-        return {"status": "initialized", "message": "Text-to-SQL Agent ready"}
-        
-    except Exception as e:
-        logger.error(f"Failed to initialize agent: {e}")
-        raise
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                try:
+                    logger.info("Initializing Text-to-SQL Agent for CML Model")
+                    
+                    # Load configuration
+                    config = load_config()
+                    
+                    # Initialize agent
+                    agent = TextToSQLAgent(config)
+                    
+                    # Pay the embedding model's first-call setup now rather
+                    # than on the first question
+                    try:
+                        agent.vector_store.warm_up()
+                    except Exception as e:
+                        logger.warning(f"Warm-up failed: {e}")
+                    
+                    _agent = agent
+                    
+                    logger.info("Agent initialized successfully")
+                    
+                except Exception as e:
+                    logger.error(f"Failed to initialize agent: {e}")
+                    raise
+    
+    return {"status": "initialized", "message": "Text-to-SQL Agent ready"}
 
 
 def predict(args: Dict[str, Any]) -> Dict[str, Any]:
@@ -81,58 +155,46 @@ def predict(args: Dict[str, Any]) -> Dict[str, Any]:
             "metadata": {...}
         }
     """
-    global _agent
+    agent = _agent
     
-    if _agent is None:
-        return {
-            "success": False,
-            "error": "Agent not initialized. Call initialize_model() first.",
-            "error_type": "initialization_error"
-        }
+    if agent is None:
+        return _NOT_INITIALIZED_ERROR.copy()
     
     try:
-        # Extract parameters
-        question = args.get("question")
-        session_id = args.get("session_id")
-        visualization_type = args.get("visualization_type")
-        skip_similar_check = args.get("skip_similar_check", False)
+        kwargs, error = _parse_args(args)
+        if error is not None:
+            return error
         
-        # Validate required parameters
-        if not question:
-            return {
-                "success": False,
-                "error": "Missing required parameter: question",
-                "error_type": "validation_error"
-            }
+        key = _result_cache_key(kwargs)
+        if key is not None:
+            cached = _cached_result(agent, key)
+            if cached is not None:
+                return cached
         
-        logger.info(f"Processing question: {question[:100]}...")
+        logger.opt(lazy=True).info(
+            "Processing question: {}...", lambda: kwargs['question'][:100]
+        )
         
         # Process question
-        result = _agent.process_question(
-            question=question,
-            session_id=session_id,
-            visualization_type=visualization_type,
-            skip_similar_check=skip_similar_check
-        )
+        result = _add_success_flag(agent.process_question(**kwargs))
         
-        # Add success flag
-        result["success"] = result.get("response_type") != ResponseType.ERROR.value
+        if key is not None and result["success"]:
+            _result_cache.put(key, copy.deepcopy(result))
         
         return result
         
     except Exception as e:
-        logger.error(f"Prediction failed: {e}", exc_info=True)
-        return {
-            "success": False,
-            "error": str(e),
-            "error_type": "processing_error"
-        }
+        return _processing_error(e)
 
 
 def batch_predict(args_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Batch prediction function for processing multiple questions.
     
+    Valid requests are handed to the agent as one batch, so their embeddings
+    are computed in a single call and questions from different sessions are
+    processed concurrently; invalid ones get their validation error in place.
+    
     Args:
         args_list: List of dictionaries, each containing request parameters
     
@@ -145,13 +207,153 @@ def batch_predict(args_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             {"question": "List top customers"}
         ]
     """
-    results = []
+    results: List[Optional[Dict[str, Any]]] = [None] * len(args_list)
+    for i, result in batch_predict_stream(args_list):
+        results[i] = result
+    return results
+
+
+def batch_predict_stream(args_list: List[Dict[str, Any]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Batch prediction that yields each result as soon as it is ready.
     
-    for args in args_list:
-        result = predict(args)
-        results.append(result)
+    For callers that can use the first answers before the slowest question
+    of the batch has finished; batch_predict collects the same results into
+    a list.
     
-    return results
+    Args:
+        args_list: List of dictionaries, each containing request parameters
+    
+    Yields:
+        Tuples of (index into `args_list`, result dictionary); invalid
+        requests come first, then questions in the order they finish
+    """
+    agent = _agent
+    
+    if agent is None:
+        for i in range(len(args_list)):
+            yield i, _NOT_INITIALIZED_ERROR.copy()
+        return
+    
+    batch = []
+    positions = []
+    
+    for i, args in enumerate(args_list):
+        try:
+            kwargs, error = _parse_args(args)
+        except Exception as e:
+            yield i, _processing_error(e)
+            continue
+        if error is not None:
+            yield i, error
+            continue
+        
+        key = _result_cache_key(kwargs)
+        cached = _cached_result(agent, key) if key is not None else None
+        if cached is not None:
+            yield i, cached
+        else:
+            batch.append(kwargs)
+            positions.append(i)
+    
+    if not batch:
+        return
+    
+    logger.info(f"Processing batch of {len(batch)} questions")
+    pending = set(range(len(batch)))
+    try:
+        for j, result in agent.iter_process_questions(batch):
+            pending.discard(j)
+            result = _add_success_flag(result)
+            key = _result_cache_key(batch[j])
+            if key is not None and result["success"]:
+                _result_cache.put(key, copy.deepcopy(result))
+            yield positions[j], result
+    except Exception as e:
+        error = _processing_error(e)
+        for j in sorted(pending):
+            yield positions[j], error.copy()
+
+
+def _parse_args(args: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Extract process_question keyword arguments from prediction args.
+    
+    Returns:
+        Tuple of (keyword arguments, None), or (None, validation error
+        response) if the args are invalid
+    """
+    question = args.get("question")
+    
+    # Validate required parameters
+    if not question:
+        return None, {
+            "success": False,
+            "error": "Missing required parameter: question",
+            "error_type": "validation_error"
+        }
+    
+    if not isinstance(question, str):
+        return None, {
+            "success": False,
+            "error": "Parameter question must be a string",
+            "error_type": "validation_error"
+        }
+    
+    return {
+        "question": question,
+        "session_id": args.get("session_id"),
+        "visualization_type": args.get("visualization_type"),
+        "skip_similar_check": args.get("skip_similar_check", False)
+    }, None
+
+
+def _result_cache_key(kwargs: Dict[str, Any]) -> Optional[Tuple]:
+    """
+    Key under which a question's result can be reused, or None if it can't.
+    
+    Only questions without a session are cached: in a session, the same
+    words can be a follow-up that means something else. Questions asking
+    to skip the similar-question check want a fresh answer.
+    """
+    if kwargs["session_id"] is not None or kwargs["skip_similar_check"]:
+        return None
+    return (kwargs["question"], kwargs["visualization_type"])
+
+
+def _cached_result(agent: TextToSQLAgent, key: Tuple) -> Optional[Dict[str, Any]]:
+    """
+    Reuse a cached result, answered in a new session of its own.
+    
+    Each caller gets its own session, seeded with the question and its
+    query, so a follow-up has the same context as after an uncached answer
+    while callers don't share one conversation. Results are deep-copied in
+    and out of the cache, so no caller shares nested data with another.
+    """
+    cached = _result_cache.get(key)
+    if cached is None:
+        return None
+    
+    logger.debug("Answering from result cache")
+    result = copy.deepcopy(cached)
+    result["session_id"] = agent.create_session_for_result(result)
+    return result
+
+
+def _add_success_flag(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Mark an agent result as successful unless it is an error response."""
+    result["success"] = result.get("response_type") != ResponseType.ERROR.value
+    return result
+
+
+def _processing_error(e: Exception) -> Dict[str, Any]:
+    """Log a failed prediction and build its error response."""
+    logger.error("Prediction failed: {}", e)
+    return {
+        "success": False,
+        "error": str(e),
+        "error_type": "processing_error"
+    }
 
 
 def feedback(args: Dict[str, Any]) -> Dict[str, Any]:
@@ -171,9 +373,9 @@ def feedback(args: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dictionary with feedback submission status
     """
-    global _agent
+    agent = _agent
     
-    if _agent is None:
+    if agent is None:
         return {
             "success": False,
             "error": "Agent not initialized"
@@ -197,16 +399,15 @@ def feedback(args: Dict[str, Any]) -> Dict[str, Any]:
             }
         
         # Parse feedback type
-        try:
-            feedback_type = FeedbackType(feedback_type_str.lower())
-        except ValueError:
+        feedback_type = FEEDBACK_TYPES.get(str(feedback_type_str).lower())
+        if feedback_type is None:
             return {
                 "success": False,
                 "error": f"Invalid feedback_type: {feedback_type_str}"
             }
         
         # Submit feedback
-        _agent.add_user_feedback(
+        agent.add_user_feedback(
             question=question,
             sql_query=sql_query,
             answer=answer,
@@ -222,13 +423,29 @@ def feedback(args: Dict[str, Any]) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        logger.error(f"Feedback submission failed: {e}")
+        logger.error("Feedback submission failed: {}", e)
         return {
             "success": False,
             "error": str(e)
         }
 
 
+def clear_result_cache(args: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Drop all cached question results.
+    
+    Call after the schema or the data behind it changes, so questions are
+    answered afresh rather than waiting for cached results to expire.
+    
+    Returns:
+        Dictionary with the number of results dropped
+    """
+    return {
+        "success": True,
+        "cleared": _result_cache.clear()
+    }
+
+
 def health_check(args: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Health check endpoint.
@@ -236,13 +453,11 @@ def health_check(args: Dict[str, Any] = None) -> Dict[str, Any]:
     Returns:
         Dictionary with health status
     """
-    global _agent
-    
-    status = "healthy" if _agent is not None else "uninitialized"
+    initialized = _agent is not None
     
     return {
-        "status": status,
-        "agent_initialized": _agent is not None,
+        "status": "healthy" if initialized else "uninitialized",
+        "agent_initialized": initialized,
         "version": "1.0.0"
     }
 
@@ -254,16 +469,16 @@ def get_stats(args: Dict[str, Any] = None) -> Dict[str, Any]:
     Returns:
         Dictionary with feedback stats
     """
-    global _agent
+    agent = _agent
     
-    if _agent is None:
+    if agent is None:
         return {
             "success": False,
             "error": "Agent not initialized"
         }
     
     try:
-        stats = _agent.feedback_manager.get_feedback_stats()
+        stats = agent.feedback_manager.get_feedback_stats()
         return {
             "success": True,
             "stats": stats
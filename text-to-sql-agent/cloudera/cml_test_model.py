@@ -7,8 +7,70 @@ Tests the deployed Text-to-SQL agent model via API calls.
 import os
 import sys
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict
+
 import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson is optional; it encodes request bodies and decodes responses
+# several times faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+# Connect timeout for model calls, in seconds
+CONNECT_TIMEOUT = 3.05
+
+# Read timeout for model calls, in seconds. Predictions can take a long time,
+# so responses are waited for indefinitely unless CML_MODEL_READ_TIMEOUT is set
+READ_TIMEOUT = (
+    float(os.environ["CML_MODEL_READ_TIMEOUT"])
+    if os.environ.get("CML_MODEL_READ_TIMEOUT")
+    else None
+)
+
+# Endpoint tests run concurrently; each prints its block of output under
+# this lock so the blocks don't interleave
+_PRINT_LOCK = threading.Lock()
+
+# Shared session, so the calls of a test run reuse one keep-alive connection
+# instead of each doing a new TLS handshake. Only failed connections are
+# retried; predictions are POSTs and aren't resent once they reach the model.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+))
+
+
+@dataclass(frozen=True)
+class ClientContext:
+    """Parts of a model call that only depend on the host and access key."""
+    url: str
+    headers: Dict[str, str]
+
+
+@lru_cache(maxsize=None)
+def _client_context(host: str, access_key: str) -> ClientContext:
+    """Build the URL and headers for a model once per host and access key."""
+    return ClientContext(
+        url=f"https://{host}/model",
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_key}"
+        }
+    )
 
 
 def call_model(
@@ -29,23 +91,27 @@ def call_model(
     Returns:
         Response dictionary
     """
-    url = f"https://{host}/model"
-    
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_key}"
-    }
+    context = _client_context(host, access_key)
     
     payload = {
         "accessKey": access_key,
         "request": data
     }
     
-    logger.info(f"Calling {function_name} endpoint...")
+    logger.info("Calling {} endpoint...", function_name)
+    
+    if ORJSON_AVAILABLE:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload).encode("utf-8")
     
-    response = requests.post(url, headers=headers, json=payload)
+    response = _SESSION.post(
+        context.url, headers=context.headers, data=body, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+    )
     response.raise_for_status()
     
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
     return response.json()
 
 
@@ -60,8 +126,9 @@ def test_health_check(host: str, access_key: str):
         function_name="health_check"
     )
     
-    print("\n=== Health Check ===")
-    print(json.dumps(result, indent=2))
+    with _PRINT_LOCK:
+        print("\n=== Health Check ===")
+        print(json.dumps(result, indent=2))
     
     return result
 
@@ -79,22 +146,28 @@ def test_prediction(host: str, access_key: str, question: str):
         }
     )
     
-    print("\n=== Prediction Result ===")
-    print(f"Question: {question}")
-    print(f"Success: {result.get('success')}")
-    print(f"Response Type: {result.get('response_type')}")
-    
-    if result.get('success'):
-        print(f"SQL Query: {result.get('metadata', {}).get('sql_query')}")
-        print(f"Row Count: {result.get('data', {}).get('row_count', 0)}")
-    else:
-        print(f"Error: {result.get('error')}")
+    with _PRINT_LOCK:
+        print("\n=== Prediction Result ===")
+        print(f"Question: {question}")
+        print(f"Success: {result.get('success')}")
+        print(f"Response Type: {result.get('response_type')}")
+        
+        if result.get('success'):
+            print(f"SQL Query: {result.get('metadata', {}).get('sql_query')}")
+            print(f"Row Count: {result.get('data', {}).get('row_count', 0)}")
+        else:
+            print(f"Error: {result.get('error')}")
     
     return result
 
 
 def test_batch_prediction(host: str, access_key: str, questions: list):
-    """Test batch prediction endpoint."""
+    """
+    Test batch prediction endpoint.
+    
+    The questions go out as one request, so the model processes them as a
+    batch rather than the client fanning them out as separate predictions.
+    """
     logger.info(f"Testing batch prediction with {len(questions)} questions")
     
     data = [{"question": q} for q in questions]
@@ -106,12 +179,13 @@ def test_batch_prediction(host: str, access_key: str, questions: list):
         function_name="batch_predict"
     )
     
-    print("\n=== Batch Prediction Results ===")
-    for i, (question, res) in enumerate(zip(questions, result)):
-        print(f"\n{i+1}. {question}")
-        print(f"   Success: {res.get('success')}")
-        if res.get('success'):
-            print(f"   Rows: {res.get('data', {}).get('row_count', 0)}")
+    with _PRINT_LOCK:
+        print("\n=== Batch Prediction Results ===")
+        for i, (question, res) in enumerate(zip(questions, result)):
+            print(f"\n{i+1}. {question}")
+            print(f"   Success: {res.get('success')}")
+            if res.get('success'):
+                print(f"   Rows: {res.get('data', {}).get('row_count', 0)}")
     
     return result
 
@@ -133,8 +207,9 @@ def test_feedback(host: str, access_key: str):
         function_name="feedback"
     )
     
-    print("\n=== Feedback Result ===")
-    print(json.dumps(result, indent=2))
+    with _PRINT_LOCK:
+        print("\n=== Feedback Result ===")
+        print(json.dumps(result, indent=2))
     
     return result
 
@@ -186,24 +261,25 @@ def main():
     print("=" * 60)
     
     try:
-        # Test health check
-        test_health_check(args.host, args.access_key)
-        
-        # Test single prediction
-        test_prediction(args.host, args.access_key, args.question)
-        
-        # Test batch prediction
         batch_questions = [
             "Show total revenue",
             "List active customers",
             "Count transactions by month"
         ]
-        test_batch_prediction(args.host, args.access_key, batch_questions)
         
-        # Test feedback
-        test_feedback(args.host, args.access_key)
+        # Health check, single and batch prediction, and feedback don't
+        # depend on each other, so their round trips overlap
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(test_health_check, args.host, args.access_key),
+                executor.submit(test_prediction, args.host, args.access_key, args.question),
+                executor.submit(test_batch_prediction, args.host, args.access_key, batch_questions),
+                executor.submit(test_feedback, args.host, args.access_key)
+            ]
+            for future in futures:
+                future.result()
         
-        # Test stats
+        # Stats last, so they include the feedback just submitted
         test_stats(args.host, args.access_key)
         
         print("\n" + "=" * 60)
@@ -4,9 +4,12 @@ Simple launcher script for Text-to-SQL Agent Gradio UI.
 This script provides a simpler way to launch the UI with better error handling.
 """
 
+import importlib.util
 import os
+import socket
 import sys
 from pathlib import Path
+from typing import Iterable, Optional
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -16,6 +19,31 @@ import logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Ports tried for the UI, in order
+UI_PORTS = range(7860, 7865)
+
+
+def _find_port(host: str, ports: Iterable[int]) -> Optional[int]:
+    """
+    Find the first port in `ports` that can be bound on `host`.
+    
+    Probing with a bare socket means the UI is only started once, on a
+    free port, instead of being built and launched again for each port
+    in use. SO_REUSEADDR matches the server's own socket, so ports left in
+    TIME_WAIT still count as free.
+    """
+    for port in ports:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                sock.bind((host, port))
+            except OSError:
+                logger.info(f"Port {port} in use, trying next port...")
+                continue
+        return port
+    return None
+
+
 def main():
     """Launch Gradio UI with setup checks."""
     print("=" * 60)
@@ -45,19 +73,20 @@ def main():
         print("   Creating it now...")
         print()
         
-        import subprocess
-        result = subprocess.run(
-            ["python", "scripts/create_telco_db.py"],
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode == 0:
-            print("✓ Test database created")
-        else:
+        # Run in this interpreter rather than starting a new one; the
+        # script's progress output is kept quiet as before
+        import contextlib
+        import io
+        try:
+            from scripts.create_telco_db import main as create_telco_db
+            with contextlib.redirect_stdout(io.StringIO()):
+                create_telco_db()
+        except Exception as e:
             print("❌ Failed to create database")
-            print(result.stderr)
+            print(e)
             sys.exit(1)
+        
+        print("✓ Test database created")
     else:
         print("✓ Test database exists")
     
@@ -65,21 +94,18 @@ def main():
     print()
     print("Checking dependencies...")
     
-    try:
-        import gradio
-        print("✓ Gradio installed")
-    except ImportError:
+    # Only look the packages up; they are imported when the UI is launched
+    if importlib.util.find_spec("gradio") is None:
         print("❌ Gradio not installed")
         print("   Run: pip install gradio==4.15.0")
         sys.exit(1)
+    print("✓ Gradio installed")
     
-    try:
-        import openai
-        print("✓ OpenAI SDK installed")
-    except ImportError:
+    if importlib.util.find_spec("openai") is None:
         print("❌ OpenAI not installed")
         print("   Run: pip install openai")
         sys.exit(1)
+    print("✓ OpenAI SDK installed")
     
     print()
     print("=" * 60)
@@ -88,37 +114,23 @@ def main():
     print()
     print("Launching Gradio UI...")
     print()
-    print("Open your browser to: http://localhost:7860")
-    print()
-    print("Press Ctrl+C to stop the server")
-    print()
     
     # Launch Gradio
     try:
-        # Use gradio_app.py with full agent
-        logger.info("Launching Gradio UI with full agent")
-        from src.ui.gradio_app import launch_ui
+        port = _find_port("127.0.0.1", UI_PORTS)
+        if port is None:
+            raise Exception(f"Could not find available port in range {UI_PORTS[0]}-{UI_PORTS[-1]}")
         
-        # Try multiple ports if needed
-        ports_to_try = [7860, 7861, 7862, 7863, 7864]
-        launched = False
+        print(f"Open your browser to: http://localhost:{port}")
+        print()
+        print("Press Ctrl+C to stop the server")
+        print()
         
-        for port in ports_to_try:
-            try:
-                logger.info(f"Attempting to launch on port {port}")
-                print(f"\n✅ UI successfully launched at: http://localhost:{port}\n")
-                launch_ui(server_name="127.0.0.1", server_port=port, share=False)
-                launched = True
-                break
-            except OSError as e:
-                if "Cannot find empty port" in str(e):
-                    logger.info(f"Port {port} in use, trying next port...")
-                    continue
-                else:
-                    raise
+        # Use gradio_app.py with full agent
+        logger.info(f"Launching Gradio UI with full agent on port {port}")
+        from src.ui.gradio_app import launch_ui
         
-        if not launched:
-            raise Exception(f"Could not find available port in range {ports_to_try[0]}-{ports_to_try[-1]}")
+        launch_ui(server_name="127.0.0.1", server_port=port, share=False)
             
     except KeyboardInterrupt:
         print()
@@ -4,7 +4,7 @@ import sys
 import os
 import sqlite3
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, NamedTuple, Optional
 
 # Set up path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -204,40 +204,47 @@ class TelcoAgent:
         }
 
 
+class TestQuestion(NamedTuple):
+    """A test question and the business area it belongs to."""
+    id: int
+    question: str
+    category: str
+
+
 # Test questions
-TEST_QUESTIONS = [
-    {
-        "id": 1,
-        "question": "What are the top 10 customers by lifetime value?",
-        "category": "Marketing"
-    },
-    {
-        "id": 2,
-        "question": "Show me the total monthly revenue from all active customers",
-        "category": "Business Operations"
-    },
-    {
-        "id": 3,
-        "question": "Which device manufacturers are most popular among our customers?",
-        "category": "Marketing"
-    },
-    {
-        "id": 4,
-        "question": "List customers with high churn risk score above 0.7 who are on premium plans costing more than $80 per month",
-        "category": "Business Operations"
-    },
-    {
-        "id": 5,
-        "question": "What is the average data usage in megabytes per customer in the last 30 days?",
-        "category": "Network Operations"
-    }
-]
+TEST_QUESTIONS = (
+    TestQuestion(
+        1,
+        "What are the top 10 customers by lifetime value?",
+        "Marketing"
+    ),
+    TestQuestion(
+        2,
+        "Show me the total monthly revenue from all active customers",
+        "Business Operations"
+    ),
+    TestQuestion(
+        3,
+        "Which device manufacturers are most popular among our customers?",
+        "Marketing"
+    ),
+    TestQuestion(
+        4,
+        "List customers with high churn risk score above 0.7 who are on premium plans costing more than $80 per month",
+        "Business Operations"
+    ),
+    TestQuestion(
+        5,
+        "What is the average data usage in megabytes per customer in the last 30 days?",
+        "Network Operations"
+    ),
+)
 
 
-def display_result(question: Dict, result: Dict):
+def display_result(question: TestQuestion, result: Dict):
     """Display question and result."""
-    console.print(f"\n[bold cyan]Question {question['id']}:[/bold cyan] {question['question']}")
-    console.print(f"[dim]Category: {question['category']}[/dim]\n")
+    console.print(f"\n[bold cyan]Question {question.id}:[/bold cyan] {question.question}")
+    console.print(f"[dim]Category: {question.category}[/dim]\n")
     
     if result['success']:
         # Show SQL
@@ -325,7 +332,7 @@ def main():
         console.print("=" * 80)
         
         with console.status(f"[bold green]Processing question {i}...") as status:
-            result = agent.process_question(question['question'])
+            result = agent.process_question(question.question)
         
         display_result(question, result)
         
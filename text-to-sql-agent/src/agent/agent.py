@@ -2,8 +2,11 @@
 Tool-based Text-to-SQL Agent with agentic tool definitions and LLM-driven workflow.
 """
 
+import queue
+import threading
 import uuid
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from enum import Enum
 from loguru import logger
 
@@ -24,7 +27,6 @@ from .validator import QuestionValidator
 from .memory import MemoryManager
 from .feedback import FeedbackManager, FeedbackType, FeedbackSource
 
-
 class ResponseType(str, Enum):
     """Type of response."""
     TABLE = "table"
@@ -62,6 +64,9 @@ class TextToSQLAgent:
         
         self._sessions: Dict[str, MemoryManager] = {}
         
+        # Serializes writes of Q&A pairs from concurrently processed questions
+        self._store_lock = threading.Lock()
+        
         # Bind tools to actual functions
         self._bind_tools()
         
@@ -843,8 +848,12 @@ Return a JSON object with the fixed query:
             
             # Step 4: Combined validation and SQL generation
             logger.info("[STEP 4] Combined validation and SQL generation")
-            logger.debug(f"[STEP 4] Question: {question}")
-            logger.debug(f"[STEP 4] Relevant tables: {[t['table_name'] for t in relevant_tables]}")
+            # Debug details are formatted only when a sink takes DEBUG
+            logger.debug("[STEP 4] Question: {}", question)
+            logger.opt(lazy=True).debug(
+                "[STEP 4] Relevant tables: {}",
+                lambda: [t['table_name'] for t in relevant_tables]
+            )
             
             combined_result = self._tool_validate_and_generate_sql(
                 question=question,
@@ -868,8 +877,10 @@ Return a JSON object with the fixed query:
                 return result
             
             # Validation passed, extract SQL query
-            logger.debug(f"[STEP 4] Combined result keys: {combined_result.keys()}")
-            logger.debug(f"[STEP 4] Generated query: {combined_result.get('query', 'NO QUERY')}")
+            logger.opt(lazy=True).debug(
+                "[STEP 4] Combined result keys: {}", lambda: list(combined_result.keys())
+            )
+            logger.debug("[STEP 4] Generated query: {}", combined_result.get('query', 'NO QUERY'))
             
             result['metadata']['validation'] = {
                 'valid': True,
@@ -899,14 +910,16 @@ Return a JSON object with the fixed query:
             
             # Step 5: Execute query
             logger.info("[STEP 5] Executing SQL query")
-            logger.debug(f"[STEP 5] About to execute: {sql_query}")
+            logger.debug("[STEP 5] About to execute: {}", sql_query)
             
             execution_result = self._tool_execute_sql_query(sql_query)
             
-            logger.debug(f"[STEP 5] Execution result keys: {execution_result.keys()}")
-            logger.debug(f"[STEP 5] Success: {execution_result.get('success')}")
-            logger.debug(f"[STEP 5] Row count: {execution_result.get('row_count', 0)}")
-            logger.debug(f"[STEP 5] Columns: {execution_result.get('columns', [])}")
+            logger.opt(lazy=True).debug(
+                "[STEP 5] Execution result keys: {}", lambda: list(execution_result.keys())
+            )
+            logger.debug("[STEP 5] Success: {}", execution_result.get('success'))
+            logger.debug("[STEP 5] Row count: {}", execution_result.get('row_count', 0))
+            logger.debug("[STEP 5] Columns: {}", execution_result.get('columns', []))
             
             result['metadata']['execution'] = {
                 'success': execution_result['success'],
@@ -948,11 +961,7 @@ Return a JSON object with the fixed query:
             result['visualization'] = visualization
             
             # Add to memory
-            memory.add_message(
-                'assistant',
-                f"Query executed successfully: {execution_result['row_count']} rows returned",
-                metadata={'sql_query': sql_query}
-            )
+            self._remember_answer(memory, sql_query, execution_result['row_count'])
             
             # Step 7: Handle feedback (eval mode)
             if self.config.feedback.enabled and self.config.feedback.eval_mode:
@@ -987,6 +996,91 @@ Return a JSON object with the fixed query:
             memory.add_message('assistant', f"Error: {str(e)}")
             return result
     
+    def process_questions(self, questions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Process a batch of questions.
+        
+        Args:
+            questions: Keyword arguments for process_question, one dict per
+                question
+        
+        Returns:
+            Results in the same order as `questions`
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(questions)
+        for i, result in self.iter_process_questions(questions):
+            results[i] = result
+        return results
+    
+    def iter_process_questions(
+        self, questions: List[Dict[str, Any]]
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Process a batch of questions, yielding each result as soon as it is ready.
+        
+        The questions' embeddings for the similar-question check are computed
+        in one batched model call up front. Questions from different sessions
+        then go through the normal pipeline concurrently, on up to
+        `llm.max_concurrent_requests` threads, since each question mostly
+        waits on the LLM and the database; questions of the same session
+        run in order, since each one sees the earlier ones in the session's
+        memory.
+        
+        Args:
+            questions: Keyword arguments for process_question, one dict per
+                question
+        
+        Yields:
+            Tuples of (index into `questions`, result), in the order the
+            questions finish
+        """
+        if self.config.validation.check_similar_questions:
+            to_check = [
+                kwargs['question'] for kwargs in questions
+                if not kwargs.get('skip_similar_check', False)
+            ]
+            if len(to_check) > 1:
+                try:
+                    self.vector_store.encode_questions(to_check)
+                except Exception as e:
+                    # Each question is still embedded on its own when searched
+                    logger.warning(f"Batch embedding failed: {e}")
+        
+        # Questions without a session each start their own
+        groups: Dict[Any, List[int]] = {}
+        for i, kwargs in enumerate(questions):
+            session_id = kwargs.get('session_id')
+            groups.setdefault(session_id if session_id is not None else (None, i), []).append(i)
+        
+        workers = min(self.config.llm.max_concurrent_requests, len(groups))
+        if workers <= 1:
+            for indices in groups.values():
+                for i in indices:
+                    yield i, self.process_question(**questions[i])
+            return
+        
+        # Workers hand over each result as it is ready; a failed group
+        # hands over its exception, with None for the index
+        finished: queue.Queue = queue.Queue()
+        
+        def process_group(indices: List[int]):
+            try:
+                for i in indices:
+                    finished.put((i, self.process_question(**questions[i])))
+            except Exception as e:
+                finished.put((None, e))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for indices in groups.values():
+                executor.submit(process_group, indices)
+            
+            for _ in range(len(questions)):
+                i, result = finished.get()
+                if i is None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise result
+                yield i, result
+    
     # ========================================================================
     # Feedback & Storage
     # ========================================================================
@@ -1001,24 +1095,26 @@ Return a JSON object with the fixed query:
     ):
         """Store Q&A pair in vector store and feedback."""
         try:
-            # Store in vector store
-            self.vector_store.add_qa_pair(
-                question=question,
-                answer=str(answer),
-                sql_query=sql_query,
-                metadata={'confidence': confidence}
-            )
-            
-            # Store in feedback database
-            self.feedback_manager.add_feedback(
-                question=question,
-                sql_query=sql_query,
-                answer=answer,
-                feedback_type=FeedbackType.POSITIVE,
-                feedback_source=FeedbackSource.EVAL_AUTO,
-                confidence_score=confidence,
-                session_id=session_id
-            )
+            # Questions of a batch can finish at the same time
+            with self._store_lock:
+                # Store in vector store
+                self.vector_store.add_qa_pair(
+                    question=question,
+                    answer=str(answer),
+                    sql_query=sql_query,
+                    metadata={'confidence': confidence}
+                )
+                
+                # Store in feedback database
+                self.feedback_manager.add_feedback(
+                    question=question,
+                    sql_query=sql_query,
+                    answer=answer,
+                    feedback_type=FeedbackType.POSITIVE,
+                    feedback_source=FeedbackSource.EVAL_AUTO,
+                    confidence_score=confidence,
+                    session_id=session_id
+                )
             
             logger.info("Q&A pair stored successfully")
             
@@ -1194,6 +1290,37 @@ Return a JSON object with the fixed query:
         logger.info(f"Created session: {session_id}")
         return session_id
     
+    def create_session_for_result(self, result: Dict[str, Any]) -> str:
+        """
+        Create a session whose memory already holds an answered question.
+        
+        For answers reused without running the pipeline again: follow-ups in
+        the new session see the question and its query just as if it had
+        been processed there.
+        
+        Args:
+            result: Successful result of process_question
+        
+        Returns:
+            ID of the new session
+        """
+        session_id = self.create_session()
+        memory = self._sessions[session_id]
+        memory.add_message('user', result['question'])
+        self._remember_answer(
+            memory, result['metadata']['sql_query'], result['data']['row_count']
+        )
+        return session_id
+    
+    @staticmethod
+    def _remember_answer(memory: MemoryManager, sql_query: str, row_count: int):
+        """Record a successfully executed query in session memory."""
+        memory.add_message(
+            'assistant',
+            f"Query executed successfully: {row_count} rows returned",
+            metadata={'sql_query': sql_query}
+        )
+    
     def get_session(self, session_id: str) -> Optional[MemoryManager]:
         """Get session memory manager."""
         return self._sessions.get(session_id)
@@ -9,6 +9,25 @@ from loguru import logger
 
 from ..utils.config import MemoryConfig
 
+# orjson is optional; it serializes several times faster than json and is
+# used for the per-message serialization done on every question
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON, with orjson when it can represent `obj`."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
 
 class ConversationMessage:
     """Represents a conversation message."""
@@ -97,7 +116,7 @@ class MemoryManager:
             }
             
             # Estimate tokens
-            msg_tokens = len(json.dumps(msg_dict)) // 4
+            msg_tokens = len(_dumps(msg_dict)) // 4
             
             if total_tokens + msg_tokens > max_tokens:
                 break
@@ -124,12 +143,9 @@ class MemoryManager:
         cache_file = self._cache_dir / "messages.json"
         
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(
-                    [msg.to_dict() for msg in self.messages],
-                    f,
-                    indent=2
-                )
+            cache_file.write_bytes(
+                _dumps([msg.to_dict() for msg in self.messages], indent=True)
+            )
         except Exception as e:
             logger.error(f"Failed to save messages to cache: {e}")
     
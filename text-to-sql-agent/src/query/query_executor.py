@@ -3,6 +3,7 @@
 from typing import Any, Dict, List, Optional
 import time
 import sqlite3
+import threading
 
 # Optional imports for different database types
 try:
@@ -71,6 +72,10 @@ class QueryExecutor:
         self.query_config = query_config
         self._connection = None
         
+        # DB-API connections don't support concurrent cursors, so queries on
+        # the persistent connection are run one at a time
+        self._connection_lock = threading.Lock()
+        
         # Determine database type
         self.db_type = getattr(query_config, 'dialect', 'hive').lower()
         
@@ -224,20 +229,21 @@ class QueryExecutor:
                 conn.close()
             else:
                 # Other databases use persistent connections
-                logger.debug(f"Getting connection for {self.db_type}...")
-                conn = self._get_connection()
-                cursor = conn.cursor()
-                
-                logger.debug("Executing query...")
-                cursor.execute(query)
-                
-                columns = [desc[0] for desc in cursor.description] if cursor.description else []
-                logger.debug(f"Query returned columns: {columns}")
-                
-                rows = cursor.fetchmany(self.query_config.max_result_rows)
-                logger.debug(f"Fetched {len(rows)} rows")
-                
-                cursor.close()
+                with self._connection_lock:
+                    logger.debug(f"Getting connection for {self.db_type}...")
+                    conn = self._get_connection()
+                    cursor = conn.cursor()
+                    
+                    logger.debug("Executing query...")
+                    cursor.execute(query)
+                    
+                    columns = [desc[0] for desc in cursor.description] if cursor.description else []
+                    logger.debug(f"Query returned columns: {columns}")
+                    
+                    rows = cursor.fetchmany(self.query_config.max_result_rows)
+                    logger.debug(f"Fetched {len(rows)} rows")
+                    
+                    cursor.close()
             
             execution_time = time.time() - start_time
             
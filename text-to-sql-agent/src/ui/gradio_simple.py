@@ -812,9 +812,6 @@ Check the **Visualization panel** on the right →"""
     if rows and columns:
         df = pd.DataFrame(rows, columns=columns)
         
-        # Create a compact, styled HTML table
-        display_df = df.head(20)
-        
         # Build clean HTML table manually for better control
         table_rows = []
         
@@ -822,8 +819,9 @@ Check the **Visualization panel** on the right →"""
         header_cells = ''.join([f'<th>{col}</th>' for col in columns])
         table_rows.append(f'<tr>{header_cells}</tr>')
         
-        # Data rows
-        for _, row in display_df.iterrows():
+        # Data rows, straight from the query's row tuples; iterrows() would
+        # build a Series per row and turn ints into floats in numeric rows
+        for row in rows[:20]:
             cells = ''.join([f'<td>{val}</td>' for val in row])
             table_rows.append(f'<tr>{cells}</tr>')
         
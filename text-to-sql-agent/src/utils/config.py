@@ -24,6 +24,8 @@ class LLMConfig(BaseModel):
     large_model: LLMModelConfig
     openai_api_key: Optional[str] = None
     anthropic_api_key: Optional[str] = None
+    # Questions of a batch sent to the LLM at once; keep within rate limits
+    max_concurrent_requests: int = 4
 
 
 class VectorStoreConfig(BaseModel):
@@ -1,9 +1,11 @@
 """Vector store management for Q&A and metadata."""
 
 from abc import ABC, abstractmethod
+from functools import cached_property
 from typing import Any, Dict, List, Optional, Tuple
 import os
 import json
+import threading
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 
@@ -12,10 +14,72 @@ from loguru import logger
 
 from ..utils.config import VectorStoreConfig
 
+# Number of question embeddings kept for reuse by later searches
+QUESTION_EMBEDDING_CACHE_SIZE = 256
+
+
+class _EmbeddingCache:
+    """Bounded map of question text to embedding; the oldest entry is evicted first."""
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, question: str) -> Optional[np.ndarray]:
+        return self._items.get(question)
+    
+    def put(self, question: str, embedding: np.ndarray):
+        with self._lock:
+            self._items.pop(question, None)
+            while len(self._items) >= self.max_size:
+                del self._items[next(iter(self._items))]
+            self._items[question] = embedding
+
 
 class VectorStore(ABC):
     """Abstract base class for vector stores."""
     
+    @cached_property
+    def _question_embeddings(self) -> _EmbeddingCache:
+        return _EmbeddingCache(QUESTION_EMBEDDING_CACHE_SIZE)
+    
+    def encode_questions(self, questions: List[str]):
+        """
+        Embed questions in one batch ahead of searching for them.
+        
+        The embeddings are kept and reused by the searches for the same
+        question text, so a batch of questions costs one model call instead
+        of one per question.
+        """
+        missing = [
+            question for question in dict.fromkeys(questions)
+            if self._question_embeddings.get(question) is None
+        ]
+        if not missing:
+            return
+        
+        for question, embedding in zip(missing, self.embedding_model.encode(missing)):
+            self._question_embeddings.put(question, embedding)
+    
+    def warm_up(self):
+        """
+        Run one throwaway embedding.
+        
+        The embedding model sets itself up on its first call, so doing that
+        at load time keeps the cost off the first question. The result is
+        not cached.
+        """
+        self.embedding_model.encode("warm up")
+    
+    def _encode_question(self, question: str) -> np.ndarray:
+        """Embed a question, reusing an embedding computed for it earlier."""
+        embedding = self._question_embeddings.get(question)
+        if embedding is None:
+            embedding = self.embedding_model.encode(question)
+            self._question_embeddings.put(question, embedding)
+        return embedding
+    
     @abstractmethod
     def add_qa_pair(
         self,
@@ -148,7 +212,7 @@ class SimpleVectorStore(VectorStore):
     ) -> str:
         """Add a Q&A pair to the vector store."""
         # Generate embedding
-        embedding = self.embedding_model.encode(question).tolist()
+        embedding = self._encode_question(question).tolist()
         
         # Create document ID
         doc_id = f"qa_{len(self.qa_pairs)}"
@@ -182,7 +246,7 @@ class SimpleVectorStore(VectorStore):
             return []
         
         # Generate embedding
-        query_embedding = self.embedding_model.encode(question).reshape(1, -1)
+        query_embedding = self._encode_question(question).reshape(1, -1)
         
         # Use config threshold if not provided
         if threshold is None:
@@ -270,7 +334,7 @@ class SimpleVectorStore(VectorStore):
             return []
         
         # Generate embedding
-        query_embedding = self.embedding_model.encode(question).reshape(1, -1)
+        query_embedding = self._encode_question(question).reshape(1, -1)
         
         # Calculate cosine similarity
         embeddings_array = np.array(self.metadata_embeddings)
@@ -346,7 +410,7 @@ class QdrantVectorStore(VectorStore):
         from qdrant_client.models import PointStruct
         
         # Generate embedding
-        embedding = self.embedding_model.encode(question).tolist()
+        embedding = self._encode_question(question).tolist()
         
         # Create document ID
         doc_id = abs(hash(question + sql_query)) % (10 ** 10)
@@ -377,7 +441,7 @@ class QdrantVectorStore(VectorStore):
     ) -> List[Dict[str, Any]]:
         """Search for similar questions."""
         # Generate embedding
-        embedding = self.embedding_model.encode(question).tolist()
+        embedding = self._encode_question(question).tolist()
         
         # Use config threshold if not provided
         if threshold is None:
@@ -466,7 +530,7 @@ class QdrantVectorStore(VectorStore):
     ) -> List[Dict[str, Any]]:
         """Search for relevant table metadata."""
         # Generate embedding
-        embedding = self.embedding_model.encode(question).tolist()
+        embedding = self._encode_question(question).tolist()
         
         # Query collection
         results = self.client.search(
@@ -531,7 +595,7 @@ class ChromaDBVectorStore(VectorStore):
     ) -> str:
         """Add a Q&A pair to the vector store."""
         # Generate embedding
-        embedding = self.embedding_model.encode(question).tolist()
+        embedding = self._encode_question(question).tolist()
         
         # Create document
         doc_id = f"qa_{hash(question + sql_query)}"
@@ -562,7 +626,7 @@ class ChromaDBVectorStore(VectorStore):
     ) -> List[Dict[str, Any]]:
         """Search for similar questions."""
         # Generate embedding
-        embedding = self.embedding_model.encode(question).tolist()
+        embedding = self._encode_question(question).tolist()
         
         # Use config threshold if not provided
         if threshold is None:
@@ -647,7 +711,7 @@ class ChromaDBVectorStore(VectorStore):
     ) -> List[Dict[str, Any]]:
         """Search for relevant table metadata."""
         # Generate embedding
-        embedding = self.embedding_model.encode(question).tolist()
+        embedding = self._encode_question(question).tolist()
         
         # Query collection
         results = self.metadata_collection.query(
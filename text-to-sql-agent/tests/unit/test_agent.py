@@ -0,0 +1,104 @@
+"""Unit tests for batch question processing in the agent."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from src.agent.agent import TextToSQLAgent
+
+
+def make_agent(max_concurrent_requests, process_question):
+    """Create an agent whose pipeline is replaced by `process_question`."""
+    agent = TextToSQLAgent.__new__(TextToSQLAgent)
+    agent.config = SimpleNamespace(
+        llm=SimpleNamespace(max_concurrent_requests=max_concurrent_requests),
+        validation=SimpleNamespace(check_similar_questions=False)
+    )
+    agent.process_question = process_question
+    return agent
+
+
+@pytest.mark.parametrize("max_concurrent_requests", [1, 4])
+def test_sessions_keep_question_order(max_concurrent_requests):
+    """Test that a session's questions run in order and results map back to their questions."""
+    calls = []
+    calls_lock = threading.Lock()
+    
+    def process_question(question, session_id=None):
+        # Slow first questions, so later ones would overtake them if a
+        # session's questions ran concurrently
+        if question.endswith("1"):
+            time.sleep(0.05)
+        with calls_lock:
+            calls.append((session_id, question))
+        return {'session_id': session_id, 'question': question}
+    
+    agent = make_agent(max_concurrent_requests, process_question)
+    questions = [
+        {'question': "a1", 'session_id': "a"},
+        {'question': "b1", 'session_id': "b"},
+        {'question': "a2", 'session_id': "a"},
+        {'question': "n1"},
+        {'question': "b2", 'session_id': "b"},
+        {'question': "a3", 'session_id': "a"},
+    ]
+    
+    results = list(agent.iter_process_questions(questions))
+    
+    assert sorted(i for i, _ in results) == list(range(len(questions)))
+    for i, result in results:
+        assert result['question'] == questions[i]['question']
+    for session_id in ("a", "b"):
+        assert [question for sid, question in calls if sid == session_id] == [
+            kwargs['question'] for kwargs in questions if kwargs.get('session_id') == session_id
+        ]
+
+
+def test_sessions_run_concurrently_up_to_limit():
+    """Test that sessions run concurrently, on no more threads than configured."""
+    active = 0
+    max_active = 0
+    active_lock = threading.Lock()
+    
+    # Each question waits for another to be in flight at the same time, so
+    # this fails (rather than hangs) if sessions are run one at a time
+    pair = threading.Barrier(2, timeout=5)
+    
+    def process_question(question, session_id=None):
+        nonlocal active, max_active
+        with active_lock:
+            active += 1
+            max_active = max(max_active, active)
+        try:
+            pair.wait()
+            return {'question': question}
+        finally:
+            with active_lock:
+                active -= 1
+    
+    agent = make_agent(2, process_question)
+    questions = [{'question': f"q{i}", 'session_id': f"s{i}"} for i in range(6)]
+    
+    results = list(agent.iter_process_questions(questions))
+    
+    assert len(results) == len(questions)
+    assert max_active == 2
+
+
+def test_failed_session_propagates():
+    """Test that an exception from one session's questions is raised to the caller."""
+    def process_question(question, session_id=None):
+        if question == "bad":
+            raise RuntimeError("LLM unavailable")
+        return {'question': question}
+    
+    agent = make_agent(4, process_question)
+    questions = [
+        {'question': "good", 'session_id': "a"},
+        {'question': "bad", 'session_id': "b"},
+        {'question': "after bad", 'session_id': "b"},
+    ]
+    
+    with pytest.raises(RuntimeError, match="LLM unavailable"):
+        list(agent.iter_process_questions(questions))
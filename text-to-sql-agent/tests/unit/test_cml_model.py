@@ -0,0 +1,102 @@
+"""Unit tests for the CML model entry point."""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+from cloudera import cml_model
+from src.agent.agent import TextToSQLAgent
+from src.agent.memory import MemoryManager
+from src.utils.config import MemoryConfig
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    """Create an agent whose pipeline answers every question with one query."""
+    agent = TextToSQLAgent.__new__(TextToSQLAgent)
+    agent.config = SimpleNamespace(
+        memory=MemoryConfig(cache_enabled=False),
+        llm=SimpleNamespace(max_concurrent_requests=4),
+        validation=SimpleNamespace(check_similar_questions=False)
+    )
+    agent._sessions = {}
+    agent.contexts = []
+    
+    def process_question(question, session_id=None, visualization_type=None, skip_similar_check=False):
+        if session_id is None:
+            session_id = agent.create_session()
+        memory = agent.get_session(session_id)
+        if memory is None:
+            memory = agent._sessions[session_id] = MemoryManager(agent.config.memory, session_id)
+        agent.contexts.append(memory.get_context(include_metadata=True))
+        memory.add_message('user', question)
+        agent._remember_answer(memory, "SELECT * FROM customers", 2)
+        return {
+            'session_id': session_id,
+            'question': question,
+            'response_type': 'table',
+            'data': {'rows': [(1, 'A'), (2, 'B')], 'row_count': 2},
+            'metadata': {'sql_query': "SELECT * FROM customers"}
+        }
+    
+    monkeypatch.setattr(agent, 'process_question', process_question)
+    monkeypatch.setattr(cml_model, '_agent', agent)
+    cml_model.clear_result_cache()
+    yield agent
+    cml_model.clear_result_cache()
+
+
+def test_follow_up_after_cache_hit(agent):
+    """Test that a follow-up to a cached answer sees the answered question."""
+    first = cml_model.predict({"question": "Show me all customers"})
+    cached = cml_model.predict({"question": "Show me all customers"})
+    
+    assert len(agent.contexts) == 1
+    assert cached['session_id'] != first['session_id']
+    
+    cml_model.predict({"question": "Only the first one", "session_id": cached['session_id']})
+    
+    context = agent.contexts[-1]
+    assert [message['role'] for message in context] == ['user', 'assistant']
+    assert context[0]['content'] == "Show me all customers"
+    assert context[1]['metadata']['sql_query'] == "SELECT * FROM customers"
+
+
+def test_cached_results_not_shared(agent):
+    """Test that callers can't change a cached result through their copy."""
+    first = cml_model.predict({"question": "Show me all customers"})
+    first['data']['rows'].clear()
+    
+    cached = cml_model.predict({"question": "Show me all customers"})
+    cached['data']['rows'].append((3, 'C'))
+    
+    assert cml_model.predict({"question": "Show me all customers"})['data']['rows'] == [(1, 'A'), (2, 'B')]
+
+
+def test_batch_failure_reports_pending_questions(agent, monkeypatch):
+    """Test that questions left pending by a failed session become processing errors."""
+    answered = threading.Event()
+    
+    def process_question(question, session_id=None, visualization_type=None, skip_similar_check=False):
+        if question == "Break the database":
+            # Fail only once the other session's answer is in, so it is
+            # reported before the failure
+            answered.wait(5)
+            raise RuntimeError("Database unavailable")
+        result = {'question': question, 'response_type': 'table', 'metadata': {}}
+        answered.set()
+        return result
+    
+    monkeypatch.setattr(agent, 'process_question', process_question)
+    
+    results = dict(cml_model.batch_predict_stream([
+        {"question": "Show me all customers", "session_id": "a"},
+        {"question": "Break the database", "session_id": "b"},
+        {"question": "Then show the orders", "session_id": "b"},
+    ]))
+    
+    assert results[0]['success'] is True
+    for i in (1, 2):
+        assert results[i]['success'] is False
+        assert results[i]['error_type'] == "processing_error"
+        assert results[i]['error'] == "Database unavailable"
@@ -98,3 +98,33 @@ def test_search_relevant_metadata(vector_store):
     
     assert len(results) > 0
     assert results[0]['table_name'] == "customers"
+
+
+def test_encode_questions_reused_by_search(vector_store):
+    """Test that batch-encoded questions are not embedded again when searched."""
+    vector_store.add_qa_pair(
+        question="What is the total revenue?",
+        answer="10000",
+        sql_query="SELECT SUM(revenue) FROM sales"
+    )
+    
+    questions = ["What is the total sales revenue?", "Show me all customers"]
+    vector_store.encode_questions(questions)
+    
+    encode = vector_store.embedding_model.encode
+    calls = []
+    vector_store.embedding_model.encode = lambda *args, **kwargs: calls.append(args) or encode(*args, **kwargs)
+    try:
+        results = vector_store.search_similar_questions(questions[0], top_k=5)
+    finally:
+        vector_store.embedding_model.encode = encode
+    
+    assert calls == []
+    assert len(results) > 0
+
+
+def test_warm_up_does_not_cache(vector_store):
+    """Test that the warm-up embedding is not kept for searches."""
+    vector_store.warm_up()
+    
+    assert vector_store._question_embeddings.get("warm up") is None